@@ -1,354 +1,124 @@
-from flask import Flask, request, send_file, render_template_string, jsonify
-from jinja2 import Template
-import os, zipfile, re, logging, json, tempfile, shutil
+from flask import Flask, Response, request, send_file, jsonify, g
+import os, io, zipfile, re, logging, json, tempfile, shutil, hashlib, zlib, threading, struct, uuid, sqlite3
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge, RequestTimeout, ServiceUnavailable, TooManyRequests
 from werkzeug.utils import secure_filename
-import time
-from functools import lru_cache
+import time, heapq, itertools, fcntl
+from contextlib import contextmanager
 import logging.config
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from engine import (
+    TEMPLATE_PATH, PACK_ICON_PATH, TEXTURE_DIR, FILTER_RULES_PATH, DEBUG_TEMPLATES, PACK_BUILD_WORKERS,
+    PACK_FORMATS, CompressedEntry, recipe_cache, recipe_cache_stats,
+    template_fingerprint, static_asset_versions, validate_item_names, file_stamp, get_item_filter,
+    iter_json_item_list, iter_ndjson_items, recipe_pairs, build_recipe_chunk,
+    get_process_pool, recipe_entry_name, iter_compressed_recipes, iter_recipe_entries,
+    write_pack_metadata, get_category_classifier, zip_write_raw, get_static_bundle, build_custom_pack,
+    resolve_pack_format, parse_catalog_path, iter_decoded_file
+)
 
 app = Flask(__name__)
 
 # Environment-based configuration
-TEMPLATE_PATH = os.getenv("TEMPLATE_PATH", "data/recipe.json.j2")
 MASTER_LIST_PATH = os.getenv("MASTER_LIST_PATH", "data/master_list.txt")
-LAST_SESSION_PATH = os.getenv("LAST_SESSION_PATH", "data/last_session.json")
+WORKSPACES_DIR = os.getenv("WORKSPACES_DIR", "data/workspaces")
+WORKSPACE_TTL = int(os.getenv("WORKSPACE_TTL", str(7 * 86400)))  # seconds an idle client's workspace is kept
+WORKSPACE_MAX_BYTES = int(os.getenv("WORKSPACE_MAX_BYTES", str(64 * 1024 * 1024)))  # per client
+WORKSPACE_MAX_COUNT = int(os.getenv("WORKSPACE_MAX_COUNT", "1000"))  # least recently used are evicted beyond this
+WORKSPACE_EVICT_MIN_IDLE = int(os.getenv("WORKSPACE_EVICT_MIN_IDLE", "3600"))  # seconds; busier workspaces are never evicted
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", "output")
-ZIP_PATH = os.getenv("ZIP_PATH", "data/output.zip")
-PACK_ICON_PATH = os.getenv("PACK_ICON_PATH", "pack_icon.png")
-TEXTURE_DIR = os.getenv("TEXTURE_DIR", "textures/blocks")
 PORT = int(os.getenv("PORT", "5097"))
-DEBUG_TEMPLATES = os.getenv("DEBUG_TEMPLATES", "false").lower() == "true"
-
-# Filtered items list - easily expandable for future problematic items
-FILTERED_ITEMS = {
-    'portfolio',  # Causes recipe generation errors - item doesn't exist in Minecraft
-    'andesite_wall',
-    'axolotl_bucket',
-    'balloon',
-    'blackstone_wall',
-    'bleach',
-    'brick_wall',
-    'chemical_heat',
-    'chipped_anvil',
-    'chiseled_bookshelf',
-    'chiseled_copper',
-    'chiseled_deepslate',
-    'chiseled_nether_bricks',
-    'chiseled_polished_blackstone',
-    'chiseled_quartz_block',
-    'chiseled_red_sandstone',
-    'chiseled_resin_bricks',
-    'chiseled_sandstone',
-    'chiseled_stone_bricks',
-    'chiseled_tuff',
-    'chiseled_tuff_bricks',
-    'coal_block',
-    'coarse_dirt',
-    'cobbled_deepslate_wall',
-    'cobblestone_wall',
-    'cod_bucket',
-    'colored_torch_blue',
-    'colored_torch_green',
-    'colored_torch_purple',
-    'colored_torch_red',
-    'compound',
-    'compound_creator',
-    'cracked_deepslate_bricks',
-    'cracked_nether_bricks',
-    'cracked_polished_blackstone_bricks',
-    'cracked_stone_bricks',
-    'cut_copper',
-    'cut_copper_slab',
-    'cut_copper_stairs',
-    'cut_red_sandstone',
-    'cut_red_sandstone_slab',
-    'cut_sandstone',
-    'cut_sandstone_slab',
-    'damaged_anvil',
-    'deepslate_brick_slab',
-    'deepslate_brick_stairs',
-    'deepslate_brick_wall',
-    'deepslate_bricks',
-    'deepslate_tile_wall',
-    'diorite_wall',
-    'element_0',
-    'element_1',
-    'element_10',
-    'element_100',
-    'element_101',
-    'element_102',
-    'element_103',
-    'element_104',
-    'element_105',
-    'element_106',
-    'element_107',
-    'element_108',
-    'element_109',
-    'element_11',
-    'element_110',
-    'element_111',
-    'element_112',
-    'element_113',
-    'element_114',
-    'element_115',
-    'element_116',
-    'element_117',
-    'element_118',
-    'element_12',
-    'element_13',
-    'element_14',
-    'element_15',
-    'element_16',
-    'element_17',
-    'element_18',
-    'element_19',
-    'element_2',
-    'element_20',
-    'element_21',
-    'element_22',
-    'element_23',
-    'element_24',
-    'element_25',
-    'element_26',
-    'element_27',
-    'element_28',
-    'element_29',
-    'element_3',
-    'element_30',
-    'element_31',
-    'element_32',
-    'element_33',
-    'element_34',
-    'element_35',
-    'element_36',
-    'element_37',
-    'element_38',
-    'element_39',
-    'element_4',
-    'element_40',
-    'element_41',
-    'element_42',
-    'element_43',
-    'element_44',
-    'element_45',
-    'element_46',
-    'element_47',
-    'element_48',
-    'element_49',
-    'element_5',
-    'element_50',
-    'element_51',
-    'element_52',
-    'element_53',
-    'element_54',
-    'element_55',
-    'element_56',
-    'element_57',
-    'element_58',
-    'element_59',
-    'element_6',
-    'element_60',
-    'element_61',
-    'element_62',
-    'element_63',
-    'element_64',
-    'element_65',
-    'element_66',
-    'element_67',
-    'element_68',
-    'element_69',
-    'element_7',
-    'element_70',
-    'element_71',
-    'element_72',
-    'element_73',
-    'element_74',
-    'element_75',
-    'element_76',
-    'element_77',
-    'element_78',
-    'element_79',
-    'element_8',
-    'element_80',
-    'element_81',
-    'element_82',
-    'element_83',
-    'element_84',
-    'element_85',
-    'element_86',
-    'element_87',
-    'element_88',
-    'element_89',
-    'element_9',
-    'element_90',
-    'element_91',
-    'element_92',
-    'element_93',
-    'element_94',
-    'element_95',
-    'element_96',
-    'element_97',
-    'element_98',
-    'element_99',
-    'element_constructor',
-    'end_brick_stairs',
-    'end_bricks',
-    'end_stone_brick_slab',
-    'end_stone_brick_wall',
-    'exposed_chiseled_copper',
-    'exposed_cut_copper',
-    'exposed_cut_copper_slab',
-    'exposed_cut_copper_stairs',
-    'glow_stick',
-    'granite_wall',
-    'hard_black_stained_glass',
-    'hard_black_stained_glass_pane',
-    'hard_blue_stained_glass',
-    'hard_blue_stained_glass_pane',
-    'hard_brown_stained_glass',
-    'hard_brown_stained_glass_pane',
-    'hard_cyan_stained_glass',
-    'hard_cyan_stained_glass_pane',
-    'hard_glass',
-    'hard_glass_pane',
-    'hard_gray_stained_glass',
-    'hard_gray_stained_glass_pane',
-    'hard_green_stained_glass',
-    'hard_green_stained_glass_pane',
-    'hard_light_blue_stained_glass',
-    'hard_light_blue_stained_glass_pane',
-    'hard_light_gray_stained_glass',
-    'hard_light_gray_stained_glass_pane',
-    'hard_lime_stained_glass',
-    'hard_lime_stained_glass_pane',
-    'hard_magenta_stained_glass',
-    'hard_magenta_stained_glass_pane',
-    'hard_orange_stained_glass',
-    'hard_orange_stained_glass_pane',
-    'hard_pink_stained_glass',
-    'hard_pink_stained_glass_pane',
-    'hard_purple_stained_glass',
-    'hard_purple_stained_glass_pane',
-    'hard_red_stained_glass',
-    'hard_red_stained_glass_pane',
-    'hard_white_stained_glass',
-    'hard_white_stained_glass_pane',
-    'hard_yellow_stained_glass',
-    'hard_yellow_stained_glass_pane',
-    'ice_bomb',
-    'infested_chiseled_stone_bricks',
-    'infested_cracked_stone_bricks',
-    'infested_mossy_stone_bricks',
-    'infested_stone_bricks',
-    'lab_table',
-    'lava_bucket',
-    'material_reducer',
-    'medicine',
-    'milk_bucket',
-    'mossy_cobblestone_wall',
-    'mossy_stone_brick_slab',
-    'mossy_stone_brick_stairs',
-    'mossy_stone_brick_wall',
-    'mossy_stone_bricks',
-    'mud_brick_slab',
-    'mud_brick_stairs',
-    'mud_brick_wall',
-    'mud_bricks',
-    'nether_brick',
-    'nether_brick_fence',
-    'nether_brick_slab',
-    'nether_brick_stairs',
-    'nether_brick_wall',
-    'oxidized_chiseled_copper',
-    'oxidized_cut_copper',
-    'oxidized_cut_copper_slab',
-    'oxidized_cut_copper_stairs',
-    'polished_blackstone_brick_slab',
-    'polished_blackstone_brick_stairs',
-    'polished_blackstone_brick_wall',
-    'polished_blackstone_bricks',
-    'polished_blackstone_wall',
-    'polished_deepslate_wall',
-    'polished_tuff_wall',
-    'powder_snow_bucket',
-    'prismarine_brick_slab',
-    'prismarine_bricks',
-    'prismarine_bricks_stairs',
-    'prismarine_wall',
-    'pufferfish_bucket',
-    'quartz_bricks',
-    'rapid_fertilizer',
-    'red_nether_brick',
-    'red_nether_brick_slab',
-    'red_nether_brick_stairs',
-    'red_nether_brick_wall',
-    'red_sand',
-    'red_sandstone',
-    'red_sandstone_slab',
-    'red_sandstone_stairs',
-    'red_sandstone_wall',
-    'resin_brick',
-    'resin_brick_slab',
-    'resin_brick_stairs',
-    'resin_brick_wall',
-    'resin_bricks',
-    'salmon_bucket',
-    'sandstone_wall',
-    'smooth_basalt',
-    'smooth_quartz',
-    'smooth_quartz_slab',
-    'smooth_quartz_stairs',
-    'smooth_red_sandstone',
-    'smooth_red_sandstone_slab',
-    'smooth_red_sandstone_stairs',
-    'smooth_sandstone',
-    'smooth_sandstone_slab',
-    'smooth_sandstone_stairs',
-    'smooth_stone',
-    'smooth_stone_slab',
-    'sparkler',
-    'stone_brick_slab',
-    'stone_brick_stairs',
-    'stone_brick_wall',
-    'stone_bricks',
-    'tadpole_bucket',
-    'tropical_fish_bucket',
-    'tuff_brick_slab',
-    'tuff_brick_stairs',
-    'tuff_brick_wall',
-    'tuff_bricks',
-    'tuff_wall',
-    'underwater_tnt',
-    'underwater_torch',
-    'water_bucket',
-    'waxed_chiseled_copper',
-    'waxed_cut_copper',
-    'waxed_cut_copper_slab',
-    'waxed_cut_copper_stairs',
-    'waxed_exposed_chiseled_copper',
-    'waxed_exposed_cut_copper',
-    'waxed_exposed_cut_copper_slab',
-    'waxed_exposed_cut_copper_stairs',
-    'waxed_oxidized_chiseled_copper',
-    'waxed_oxidized_cut_copper',
-    'waxed_oxidized_cut_copper_slab',
-    'waxed_oxidized_cut_copper_stairs',
-    'waxed_weathered_chiseled_copper',
-    'waxed_weathered_cut_copper',
-    'waxed_weathered_cut_copper_slab',
-    'waxed_weathered_cut_copper_stairs',
-    'weathered_chiseled_copper',
-    'weathered_cut_copper',
-    'weathered_cut_copper_slab',
-    'weathered_cut_copper_stairs',
-    'wet_sponge'
-}
+WRITE_LOOSE_RECIPES = os.getenv("WRITE_LOOSE_RECIPES", "false").lower() == "true"  # debug: also write each recipe to the workspace's output/
+PACK_CACHE_DIR = os.getenv("PACK_CACHE_DIR", "data/pack_cache")
+PACK_CACHE_MAX_BYTES = int(os.getenv("PACK_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # 0 disables the cache
+STREAM_DOWNLOADS = os.getenv("STREAM_DOWNLOADS", "true").lower() == "true"
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", str(64 * 1024)))
+JOBS_DIR = os.getenv("JOBS_DIR", "data/jobs")
+BUILD_JOB_WORKERS = int(os.getenv("BUILD_JOB_WORKERS", "2"))
+BUILD_JOB_MAX_PENDING = int(os.getenv("BUILD_JOB_MAX_PENDING", "16"))  # queued + running jobs per process
+BUILD_JOB_TTL = int(os.getenv("BUILD_JOB_TTL", "3600"))  # seconds
+BUILD_JOB_PROGRESS_INTERVAL = 0.5  # seconds between progress writes
+BUILD_JOB_STALL_SECONDS = int(os.getenv("BUILD_JOB_STALL_SECONDS", "30"))  # running job without progress is failed
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "data/rate_limits.db")
+CATALOG_UPLOAD_DIR = os.getenv("CATALOG_UPLOAD_DIR", "data/catalog_uploads")
+CATALOG_MAX_BYTES = int(os.getenv("CATALOG_MAX_BYTES", str(1024 * 1024 * 1024)))  # per catalog upload
+CATALOG_UPLOAD_TTL = int(os.getenv("CATALOG_UPLOAD_TTL", "86400"))  # seconds an unfinished upload can be resumed
+CATALOG_UPLOAD_MAX_TOTAL_BYTES = int(os.getenv("CATALOG_UPLOAD_MAX_TOTAL_BYTES", str(4 * 1024 * 1024 * 1024)))  # declared size of all live uploads
+CATALOG_STREAM_BATCH = int(os.getenv("CATALOG_STREAM_BATCH", "1000"))  # items per NDJSON line
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))  # smaller responses are sent as is
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+COMPRESSIBLE_MIMETYPES = {"text/html", "text/plain", "application/json", "application/x-ndjson"}
+MAX_REQUEST_BYTES = 10 * 1024 * 1024  # every other request, including each upload chunk
+GENERATE_MAX_BYTES = int(os.getenv("GENERATE_MAX_BYTES", str(MAX_REQUEST_BYTES)))  # /api/generate request body
+GENERATE_MAX_SECONDS = float(os.getenv("GENERATE_MAX_SECONDS", "60"))  # reading, validating and building one /api/generate pack
+SESSION_FLUSH_WINDOW = float(os.getenv("SESSION_FLUSH_WINDOW", "0.02"))  # seconds session saves are coalesced
+SESSION_JOURNAL_COMPACT_BYTES = int(os.getenv("SESSION_JOURNAL_COMPACT_BYTES", str(256 * 1024)))
+SESSION_WRITE_TIMEOUT = 10  # seconds a save waits for its flush
+SESSION_STATE_MAX_ENTRIES = 1000  # replayed sessions kept per process
+JANITOR_SWEEP_INTERVAL = int(os.getenv("JANITOR_SWEEP_INTERVAL", "300"))  # seconds
+JANITOR_BATCH_SIZE = 100  # expired artifacts deleted per wake-up
+
+# Bump when the archive layout changes so stale cached packs are never served
+PACK_CACHE_VERSION = 1
+
+# Build job, workspace client (client_id cookie) and chunked upload ids are uuid4 hex strings
+HEX_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+CLIENT_ID_COOKIE = "client_id"
+
+# Pack cache keys are sha256 hex digests
+PACK_KEY_RE = re.compile(r'^[0-9a-f]{64}$')
+
+# Sessions: a JSON snapshot plus a journal of deltas appended after it, one pair per
+# workspace. Replayed states are kept per snapshot path in LRU order; items and selected
+# are ordered dicts so deltas apply in O(1) per item
+SESSION_DELTA_FIELDS = [("items", "add", "remove"), ("selected", "select", "deselect")]
+session_states = OrderedDict()
+session_state_lock = threading.Lock()
+
+# Session writer: per snapshot path, the latest unsaved session and the callers waiting for it
+session_writer = {"pending": {}, "waiters": {}, "compact": set(), "pid": None}
+session_writer_lock = threading.Condition()
+
+# Paths of one client's workspace (see get_workspace)
+Workspace = namedtuple("Workspace", ["client_id", "root", "session_path", "zip_path", "output_dir"])
+
+# Rate limiting - token buckets in a SQLite store shared by all workers
+RATE_LIMIT_REQUESTS = 10  # default requests per window
+RATE_LIMIT_WINDOW = 60    # default window in seconds
+RATE_LIMIT_EVICT_EVERY = 1000  # checks per thread between idle bucket evictions
+RATE_LIMIT_FALLBACK_MAX_KEYS = 10000
+rate_limit_local = threading.local()
+rate_limit_fallback = {}
+rate_limit_fallback_lock = threading.Lock()
 
-# Rate limiting - simple in-memory store (use Redis in production)
-download_requests = {}
-RATE_LIMIT_REQUESTS = 10  # requests per minute
-RATE_LIMIT_WINDOW = 60    # seconds
+# Master list snapshot (per process). The file is append-only, so its length in bytes
+# is the generation: a larger file means new lines, a smaller or replaced one means reload
+master_list_snapshot = {"inode": None, "generation": 0, "items": [], "keys": set()}
+master_list_lock = threading.Lock()
+
+# Pack cache counters (per process)
+pack_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+# Background build job pool, created lazily per process (see get_job_executor)
+job_executor = None
+job_executor_pid = None
+job_executor_lock = threading.Lock()
+pending_jobs = 0
+
+# Janitor: expiring artifacts in a min-heap of (deadline, sequence, path, size)
+janitor_heap = []
+janitor_sequence = itertools.count()
+janitor_lock = threading.Condition()
+janitor_pid = None
+janitor_stats = {"pending": 0, "pending_bytes": 0, "reclaimed": 0, "reclaimed_bytes": 0, "sweeps": 0}
 
 # Improved logging configuration
 LOGGING_CONFIG = {
@@ -393,118 +163,394 @@ except FileNotFoundError:
     </body></html>
     """
 
-@lru_cache(maxsize=1)
-def load_template():
-    """Load and cache the Jinja2 template"""
+PAGE_MARKUP_RE = re.compile(r"\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}", re.S)
+PageTemplate = namedtuple("PageTemplate", ["head", "fragment", "tail"])
+StaticPage = namedtuple("StaticPage", ["etag", "bodies"])
+
+def compile_page(source):
+    """Split the page into static text around one compiled fragment holding all its template markup"""
+    # Match Jinja's defaults: normalized newlines and a single trailing newline dropped
+    source = source.replace('\r\n', '\n').replace('\r', '\n')
+    if source.endswith('\n'):
+        source = source[:-1]
+    
+    markup = [match.span() for match in PAGE_MARKUP_RE.finditer(source)]
+    if not markup:
+        return PageTemplate(source, None, "")
+    start = source.rfind('\n', 0, markup[0][0]) + 1
+    end = source.find('\n', markup[-1][1])
+    if end < 0:
+        end = len(source)
+    return PageTemplate(source[:start], app.jinja_env.from_string(source[start:end]), source[end:])
+
+def render_page(message="", error=""):
+    """Render the page, running only the message/error fragment through Jinja"""
+    if page_template.fragment is None:
+        return page_template.head
+    return page_template.head + page_template.fragment.render(message=message, error=error) + page_template.tail
+
+def build_static_page(message="", error=""):
+    """Render a page variant once and precompress it for every supported encoding"""
+    body = render_page(message, error).encode('utf-8')
+    bodies = {None: body, "gzip": gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body)
+    return StaticPage(hashlib.sha256(body).hexdigest()[:32], bodies)
+
+def static_page_response(page, status=200):
+    """Serve a prebuilt page in the best encoding the client accepts, or 304 if it is unchanged"""
+    encoding = request.accept_encodings.best_match([e for e in page.bodies if e is not None])
+    etag = page.etag + (f"-{encoding}" if encoding else "")
+    if status == 200 and etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(page.bodies[encoding], status=status, mimetype="text/html")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    if status == 200:
+        # Private because every response also carries the client's workspace cookie
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+page_template = compile_page(HTML_TEMPLATE)
+static_pages = {
+    "index": build_static_page(),
+    "not_found": build_static_page(error="Page not found."),
+    "internal_error": build_static_page(error="Internal server error. Please try again."),
+}
+
+def pack_cache_key(format_type, items):
+    """Content hash identifying a finished pack"""
+    payload = json.dumps({
+        "version": PACK_CACHE_VERSION,
+        "format": format_type,
+        "items": sorted(items),
+        "template": template_fingerprint(),
+        "assets": static_asset_versions(),
+        "categories": get_category_classifier().fingerprint if format_type == 'custom' else None
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def pack_cache_path(key):
+    """Location of a cached pack on disk"""
+    return os.path.join(PACK_CACHE_DIR, f"{key}.zip")
+
+def pack_cache_get(key):
+    """Return the cached pack for key, or None on a miss"""
+    if PACK_CACHE_MAX_BYTES <= 0:
+        return None
+    
+    path = pack_cache_path(key)
     try:
-        with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if DEBUG_TEMPLATES:
-                logger.info(f"Template loaded from: {TEMPLATE_PATH}")
-                logger.info(f"Template content preview: {content[:200]}...")
-            return Template(content)
-    except FileNotFoundError:
-        logger.error(f"Template file not found: {TEMPLATE_PATH}")
-        raise
-    except Exception as e:
-        logger.error(f"Error loading template: {e}")
-        raise
+        # Touching the file marks it as most recently used for eviction
+        os.utime(path)
+    except OSError:
+        pack_cache_stats["misses"] += 1
+        return None
+    
+    pack_cache_stats["hits"] += 1
+    return path
+
+def pack_cache_open(key):
+    """Open the cached pack for key for sending, or None on a miss.
+    
+    The open file survives a concurrent eviction, which a path checked first would not.
+    """
+    if PACK_CACHE_MAX_BYTES <= 0:
+        return None
+    
+    try:
+        pack_file = open(pack_cache_path(key), 'rb')
+    except OSError:
+        pack_cache_stats["misses"] += 1
+        return None
+    try:
+        # Touching the file marks it as most recently used for eviction
+        os.utime(pack_file.fileno())
+    except OSError:
+        pass
+    
+    pack_cache_stats["hits"] += 1
+    return pack_file
+
+def pack_cache_put(key, source_path):
+    """Move a finished archive into the cache and evict down to the size bound"""
+    os.makedirs(PACK_CACHE_DIR, exist_ok=True)
+    path = pack_cache_path(key)
+    os.replace(source_path, path)
+    pack_cache_evict(keep=path)
+    return path
+
+def pack_cache_evict(keep=None):
+    """Remove least recently used packs until the cache fits PACK_CACHE_MAX_BYTES"""
+    entries = []
+    total_size = 0
+    try:
+        for f_name in os.listdir(PACK_CACHE_DIR):
+            if not f_name.endswith(".zip"):
+                continue
+            file_path = os.path.join(PACK_CACHE_DIR, f_name)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, file_path, st.st_size))
+            total_size += st.st_size
+    except OSError as e:
+        logger.warning(f"Could not scan pack cache: {e}")
+        return
+    
+    entries.sort()
+    for _, file_path, size in entries:
+        if total_size <= PACK_CACHE_MAX_BYTES:
+            break
+        if file_path == keep:
+            continue
+        try:
+            os.remove(file_path)
+            total_size -= size
+            pack_cache_stats["evictions"] += 1
+            logger.info(f"Evicted cached pack: {os.path.basename(file_path)} ({size:,} bytes)")
+        except OSError as e:
+            logger.warning(f"Could not evict cached pack {file_path}: {e}")
 
 def safe_file_write(file_path, content):
     """Safely write content to file with proper error handling"""
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        if isinstance(content, bytes):
+            with open(file_path, 'wb') as f:
+                f.write(content)
+        else:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
         return True
     except Exception as e:
         logger.error(f"Failed to write file {file_path}: {e}")
         return False
 
-def safe_filename(name):
-    """Create safe filename from item name"""
-    if not name or not isinstance(name, str):
-        raise ValueError("Invalid item name")
-    
-    # Remove dangerous characters and limit length
-    safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', name.strip())
-    if len(safe_name) > 50:
-        safe_name = safe_name[:50]
+def parse_rate_limits(spec):
+    """Parse 'endpoint=requests/seconds,...' over the default per-endpoint limits"""
+    limits = {
+        "download": (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW),
+        "jobs": (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW),
+        "generate": (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW),
+        "workspace": (RATE_LIMIT_REQUESTS, 600),  # new workspaces per client
+        "catalog_upload": (RATE_LIMIT_REQUESTS, 600)  # new chunked uploads per client
+    }
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        try:
+            endpoint, _, value = part.partition('=')
+            requests_allowed, _, seconds = value.partition('/')
+            requests_allowed, seconds = int(requests_allowed), float(seconds or RATE_LIMIT_WINDOW)
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit: {part}")
+            continue
+        # A bucket needs at least one token and a positive refill window
+        if requests_allowed < 1 or not seconds > 0:
+            logger.warning(f"Ignoring rate limit without at least 1 request per positive window: {part}")
+            continue
+        limits[endpoint.strip()] = (requests_allowed, seconds)
+    return limits
+
+# Per-endpoint limits, e.g. RATE_LIMITS="download=10/60,jobs=5/60"
+RATE_LIMITS = parse_rate_limits(os.getenv("RATE_LIMITS", ""))
+
+def rate_limit_connection():
+    """Return this thread's connection to the shared rate limit store"""
+    conn = getattr(rate_limit_local, "conn", None)
+    if conn is not None and rate_limit_local.pid == os.getpid():
+        return conn
     
-    if not safe_name:
-        raise ValueError("Item name results in empty filename")
+    os.makedirs(os.path.dirname(RATE_LIMIT_DB_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(RATE_LIMIT_DB_PATH, timeout=1.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("""CREATE TABLE IF NOT EXISTS buckets (
+        key TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated REAL NOT NULL
+    ) WITHOUT ROWID""")
+    rate_limit_local.conn = conn
+    rate_limit_local.pid = os.getpid()
+    rate_limit_local.checks = 0
+    return conn
+
+def client_address():
+    """Key every per-client rate limit uses: X-Forwarded-For, else the peer address.
     
-    return safe_name
+    Deployments are expected to sit behind a reverse proxy that sets X-Forwarded-For.
+    One that does not makes every request share the proxy's address, so per-client
+    limits (including new workspaces) become site-wide; raise them via RATE_LIMITS.
+    """
+    return request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR', 'unknown'))
 
-def validate_item_names(items):
-    """Validate a list of item names"""
-    if not isinstance(items, list):
-        raise ValueError("Items must be a list")
+def check_rate_limit(client_ip, endpoint="download"):
+    """Token bucket rate limiting shared by every worker process.
     
-    validated_items = []
-    for item in items:
-        if not isinstance(item, str):
-            continue
+    Each (endpoint, client) bucket holds up to `requests` tokens and refills at
+    requests/seconds per second. A single UPSERT refills and spends a token
+    atomically, so checks are O(1) and need no explicit locking.
+    """
+    capacity, window = RATE_LIMITS.get(endpoint, (RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW))
+    rate = capacity / window
+    key = f"{endpoint}:{client_ip}"
+    now = time.time()
+    
+    try:
+        conn = rate_limit_connection()
+        row = conn.execute("""
+            INSERT INTO buckets (key, tokens, updated) VALUES (:key, :capacity - 1, :now)
+            ON CONFLICT(key) DO UPDATE SET
+                tokens = MIN(:capacity, tokens + (:now - updated) * :rate) - 1,
+                updated = :now
+            WHERE MIN(:capacity, tokens + (:now - updated) * :rate) >= 1
+            RETURNING tokens
+        """, {"key": key, "capacity": capacity, "now": now, "rate": rate}).fetchone()
         
-        item = item.strip()
-        if not item:
-            continue
-            
-        # Check for reasonable length and characters
-        if len(item) > 100:
-            raise ValueError(f"Item name too long: {item}")
+        # Buckets idle for longer than the longest window are full again and can go
+        rate_limit_local.checks += 1
+        if rate_limit_local.checks % RATE_LIMIT_EVICT_EVERY == 0:
+            longest_window = max(seconds for _, seconds in RATE_LIMITS.values())
+            conn.execute("DELETE FROM buckets WHERE updated < ?", (now - longest_window,))
         
-        if not re.match(r'^[a-zA-Z0-9_\-\s]+$', item):
-            raise ValueError(f"Invalid characters in item name: {item}")
+        return row is not None
+    except sqlite3.Error as e:
+        logger.warning(f"Rate limit store unavailable, limiting per process: {e}")
+        return check_rate_limit_locally(key, capacity, rate, now)
+
+def check_rate_limit_locally(key, capacity, rate, now):
+    """Per-process token bucket used when the shared store cannot be reached"""
+    with rate_limit_fallback_lock:
+        tokens, updated = rate_limit_fallback.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        rate_limit_fallback[key] = (tokens - 1 if allowed else tokens, now)
         
-        validated_items.append(item)
-    
-    return validated_items
+        # Oldest keys are dropped first since the dict keeps insertion order
+        while len(rate_limit_fallback) > RATE_LIMIT_FALLBACK_MAX_KEYS:
+            rate_limit_fallback.pop(next(iter(rate_limit_fallback)))
+        return allowed
 
-def check_rate_limit(client_ip):
-    """Simple rate limiting"""
-    now = time.time()
-    
-    # Clean old requests
-    cutoff = now - RATE_LIMIT_WINDOW
-    download_requests[client_ip] = [req_time for req_time in download_requests.get(client_ip, []) if req_time > cutoff]
+def load_last_session(session_path):
+    """Load the user's last session data"""
+    try:
+        with session_state_lock:
+            state = refresh_session_state(session_path)
+            return {"items": list(state["items"]), "selected": list(state["selected"]),
+                    "timestamp": state["timestamp"], "rev": state["seq"]}
+    except (json.JSONDecodeError, IOError, ValueError) as e:
+        logger.warning(f"Could not load last session data: {e}")
     
-    # Check if over limit
-    if len(download_requests.get(client_ip, [])) >= RATE_LIMIT_REQUESTS:
-        return False
+    return {"items": [], "selected": [], "timestamp": None, "rev": 0}
+
+def refresh_session_state(session_path):
+    """Bring the replayed session up to date with the snapshot and journal; call with session_state_lock held"""
+    state = session_states.get(session_path)
+    if state is None:
+        state = session_states[session_path] = {"snapshot_stamp": None, "journal_inode": None, "journal_offset": 0}
+        if len(session_states) > SESSION_STATE_MAX_ENTRIES:
+            session_states.popitem(last=False)
+    else:
+        session_states.move_to_end(session_path)
     
-    # Add current request
-    if client_ip not in download_requests:
-        download_requests[client_ip] = []
-    download_requests[client_ip].append(now)
+    journal_path = session_path + ".journal"
+    snapshot_stamp = file_stamp(session_path)
+    journal_stamp = file_stamp(journal_path)
+    journal_inode, journal_size = journal_stamp[:2] if journal_stamp else (None, 0)
     
-    return True
-
-def load_last_session():
-    """Load the user's last session data"""
-    try:
-        if os.path.exists(LAST_SESSION_PATH):
-            with open(LAST_SESSION_PATH, 'r', encoding='utf-8') as f:
+    # A new snapshot or a rotated journal means compaction ran; start over from the snapshot
+    if ("seq" not in state or snapshot_stamp != state["snapshot_stamp"] or journal_inode != state["journal_inode"]
+            or journal_size < state["journal_offset"]):
+        state.update(snapshot_stamp=None, journal_inode=journal_inode, journal_offset=0,
+                     snapshot_seq=0, seq=0, items={}, selected={}, timestamp=None)
+        if snapshot_stamp is not None:
+            with open(session_path, 'r', encoding='utf-8') as f:
+                stat = os.fstat(f.fileno())
                 data = json.load(f)
-                
+            
             # Validate loaded data
             if not isinstance(data, dict):
                 raise ValueError("Invalid session data format")
             
-            items = validate_item_names(data.get("items", []))
-            selected = validate_item_names(data.get("selected", []))
-            
-            return {
-                "items": items,
-                "selected": selected,
-                "timestamp": data.get("timestamp")
-            }
-    except (json.JSONDecodeError, IOError, ValueError) as e:
-        logger.warning(f"Could not load last session data: {e}")
+            state.update(items=dict.fromkeys(validate_item_names(data.get("items", []))),
+                         selected=dict.fromkeys(validate_item_names(data.get("selected", []))),
+                         timestamp=data.get("timestamp"), seq=data.get("seq", 0))
+            state["snapshot_seq"] = state["seq"]
+            state["snapshot_stamp"] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    
+    if journal_size > state["journal_offset"]:
+        with open(journal_path, 'rb') as f:
+            f.seek(state["journal_offset"])
+            data = f.read(journal_size - state["journal_offset"])
+        
+        # Only replay complete records; a partial tail is picked up next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                apply_session_record(state, line)
+        state["journal_offset"] += end
+    
+    return state
+
+def apply_session_record(state, line):
+    """Apply one journal record to the replayed session, skipping ones the snapshot already has"""
+    try:
+        record = json.loads(line)
+        seq = int(record["seq"])
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Skipping unreadable session journal record: {e}")
+        return
+    if seq <= state["seq"]:
+        return
+    
+    try:
+        # Validate everything before touching state so a bad record changes nothing
+        changes = [(field, validate_item_names(record[field]) if field in record else None,
+                    validate_item_names(record.get(add_key, [])), validate_item_names(record.get(remove_key, [])))
+                   for field, add_key, remove_key in SESSION_DELTA_FIELDS]
+    except (ValueError, TypeError) as e:
+        # Its seq is still consumed so the next record is not numbered the same
+        logger.warning(f"Skipping invalid session journal record {seq}: {e}")
+        state["seq"] = seq
+        return
     
-    return {"items": [], "selected": [], "timestamp": None}
+    for field, replacement, added, removed in changes:
+        if field in record:
+            state[field] = dict.fromkeys(replacement)
+            continue
+        values = state[field]
+        for item in removed:
+            values.pop(item, None)
+        for item in added:
+            values[item] = None
+    state.update(seq=seq, timestamp=record.get("ts"))
+
+def session_delta(state, session_data):
+    """Journal record turning the replayed session into session_data"""
+    record = {"seq": state["seq"] + 1, "ts": session_data["timestamp"]}
+    for field, add_key, remove_key in SESSION_DELTA_FIELDS:
+        current = state[field]
+        target = dict.fromkeys(session_data[field])
+        added = [item for item in target if item not in current]
+        removed = [item for item in current if item not in target]
+        
+        # Deltas keep survivors in place and append additions; a reordered list, or one
+        # that changed more than it kept, is written whole
+        if len(added) + len(removed) > len(target) or [item for item in current if item in target] + added != list(target):
+            record[field] = list(target)
+            continue
+        if added:
+            record[add_key] = added
+        if removed:
+            record[remove_key] = removed
+    return record
 
-def save_session(items, selected_items):
+def save_session(items, selected_items, session_path):
     """Save the current session data"""
     try:
         # Validate inputs
@@ -517,123 +563,464 @@ def save_session(items, selected_items):
             "timestamp": datetime.now().isoformat()
         }
         
-        os.makedirs("data", exist_ok=True)
-        
-        # Write to temporary file first, then rename (atomic operation)
-        temp_path = LAST_SESSION_PATH + ".tmp"
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, indent=2, ensure_ascii=False)
+        # Saves arriving within SESSION_FLUSH_WINDOW share one journal append; only
+        # the latest state matters, so earlier pending saves are simply replaced
+        flushed = threading.Event()
+        outcome = {}
+        with session_writer_lock:
+            ensure_session_writer()
+            session_writer["pending"][session_path] = session_data
+            session_writer["waiters"].setdefault(session_path, []).append((flushed, outcome))
+            session_writer_lock.notify()
         
-        os.replace(temp_path, LAST_SESSION_PATH)
+        if not flushed.wait(SESSION_WRITE_TIMEOUT):
+            raise IOError("Timed out waiting for the session journal")
+        if outcome.get("error"):
+            raise outcome["error"]
         logger.info(f"Session saved: {len(items)} items, {len(selected_items)} selected")
         
     except (IOError, ValueError) as e:
         logger.error(f"Could not save session data: {e}")
         raise
 
+def ensure_session_writer():
+    """Start this process's session writer thread if needed; call with session_writer_lock held"""
+    if session_writer["pid"] != os.getpid():
+        session_writer.update(pending={}, waiters={}, compact=set(), pid=os.getpid())
+        threading.Thread(target=run_session_writer, name="session-writer", daemon=True).start()
+
+def request_session_compaction(session_path):
+    """Have the session writer compact a journal that grew past the threshold, off the request thread"""
+    with session_writer_lock:
+        ensure_session_writer()
+        session_writer["compact"].add(session_path)
+        session_writer_lock.notify()
+
+def run_session_writer():
+    """Flush coalesced session saves to their journals and compact journals that grow large"""
+    last_flush = float("-inf")
+    while True:
+        with session_writer_lock:
+            while not session_writer["pending"] and not session_writer["compact"]:
+                session_writer_lock.wait()
+            # Compactions asked for by requests that appended directly
+            compact = session_writer["compact"]
+            session_writer["compact"] = set()
+        
+        for session_path in compact:
+            try:
+                compact_session_journal(session_path)
+            except Exception as e:
+                logger.warning(f"Session journal compaction failed: {e}")
+        with session_writer_lock:
+            if not session_writer["pending"]:
+                continue
+        
+        # An isolated save flushes at once; a burst is written at most once per window
+        delay = last_flush + SESSION_FLUSH_WINDOW - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        last_flush = time.monotonic()
+        with session_writer_lock:
+            pending = session_writer["pending"]
+            waiters = session_writer["waiters"]
+            session_writer.update(pending={}, waiters={})
+        
+        for session_path, session_data in pending.items():
+            error = None
+            try:
+                _, journal_size = append_session_record(session_path, lambda state: session_delta(state, session_data))
+            except Exception as e:
+                logger.error(f"Session journal write failed: {e}")
+                error = e if isinstance(e, IOError) else IOError(str(e))
+            
+            for flushed, outcome in waiters.get(session_path, []):
+                outcome["error"] = error
+                flushed.set()
+            
+            if error is None and journal_size >= SESSION_JOURNAL_COMPACT_BYTES:
+                try:
+                    compact_session_journal(session_path)
+                except Exception as e:
+                    logger.warning(f"Session journal compaction failed: {e}")
+
+def append_session_record(session_path, make_record):
+    """Append make_record(state) to the journal; returns (record, journal size), or (None, None) if it declined"""
+    os.makedirs(os.path.dirname(session_path) or ".", exist_ok=True)
+    with file_lock(session_path + ".lock"):
+        # Other workers may have appended since this process last looked
+        with session_state_lock:
+            record = make_record(refresh_session_state(session_path))
+        if record is None:
+            return None, None
+        
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b"\n"
+        with open(session_path + ".journal", "a+b") as f:
+            # Start on a fresh line after a record torn by a crash
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            return record, f.tell()
+
+def compact_session_journal(session_path):
+    """Fold the journal into a new snapshot and start an empty journal"""
+    with file_lock(session_path + ".lock"):
+        with session_state_lock:
+            state = refresh_session_state(session_path)
+            session_data = {
+                "items": list(state["items"]),
+                "selected": list(state["selected"]),
+                "timestamp": state["timestamp"],
+                "seq": state["seq"]
+            }
+        
+        # Snapshot first: if we crash before the journal is reset, replay skips
+        # records up to the snapshot's seq
+        temp_path = session_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(session_data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, session_path)
+        
+        journal_path = session_path + ".journal"
+        open(journal_path + ".tmp", 'wb').close()
+        os.replace(journal_path + ".tmp", journal_path)
+    
+    logger.info(f"Session journal compacted at seq {session_data['seq']}")
+
 def get_all_items():
     """Get all items from master list"""
+    return list(refresh_master_list()["items"])
+
+@contextmanager
+def file_lock(lock_path):
+    """Hold an exclusive cross-process lock on lock_path for the duration of the block"""
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def refresh_master_list():
+    """Bring this process's master list snapshot up to the file's current generation"""
+    with master_list_lock:
+        snapshot = master_list_snapshot
+        try:
+            stat = os.stat(MASTER_LIST_PATH)
+        except OSError:
+            snapshot.update(inode=None, generation=0, items=[], keys=set())
+            return snapshot
+        
+        if stat.st_ino != snapshot["inode"] or stat.st_size < snapshot["generation"]:
+            snapshot.update(inode=stat.st_ino, generation=0, items=[], keys=set())
+        if stat.st_size == snapshot["generation"]:
+            return snapshot
+        
+        try:
+            with open(MASTER_LIST_PATH, 'rb') as f:
+                f.seek(snapshot["generation"])
+                data = f.read(stat.st_size - snapshot["generation"])
+        except IOError as e:
+            logger.warning(f"Could not read master list: {e}")
+            return snapshot
+        
+        # Only consume complete lines; a partial tail is picked up next time. A tail nobody
+        # is appending to is a final line without its newline, so that is added first
+        end = data.rfind(b"\n") + 1
+        if end < len(data) and terminate_master_list():
+            try:
+                with open(MASTER_LIST_PATH, 'rb') as f:
+                    f.seek(snapshot["generation"])
+                    data = f.read()
+            except IOError as e:
+                logger.warning(f"Could not read master list: {e}")
+                return snapshot
+            end = data.rfind(b"\n") + 1
+        if not end:
+            return snapshot
+        lines = data[:end].decode('utf-8', errors='replace').splitlines()
+        try:
+            lines = validate_item_names(lines)
+        except ValueError as e:
+            logger.warning(f"Skipping invalid master list entries: {e}")
+            lines = [line for line in lines if valid_master_line(line)]
+        
+        items, keys = snapshot["items"], snapshot["keys"]
+        for line in lines:
+            key = line.lower()
+            if key not in keys:
+                keys.add(key)
+                items.append(line)
+        snapshot["generation"] += end
+        return snapshot
+
+def terminate_master_list():
+    """Add the newline missing after a hand-edited or legacy final line; False while an append holds the lock"""
+    with open(MASTER_LIST_PATH + ".lock", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        try:
+            with open(MASTER_LIST_PATH, "a+b") as f:
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+            return True
+        except IOError as e:
+            logger.warning(f"Could not terminate master list: {e}")
+            return False
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def valid_master_line(line):
+    """Whether a single master list line passes item name validation"""
     try:
-        if os.path.exists(MASTER_LIST_PATH):
-            with open(MASTER_LIST_PATH, 'r', encoding='utf-8') as f:
-                items = [line.strip() for line in f if line.strip()]
-            return validate_item_names(items)
-    except (IOError, ValueError) as e:
-        logger.warning(f"Could not read master list: {e}")
+        return bool(validate_item_names([line]))
+    except ValueError:
+        return False
+
+def add_master_items(items):
+    """Append items missing from the master list in one batch; returns the items added"""
+    keys = refresh_master_list()["keys"]
+    if all(item.lower() in keys for item in items):
+        return []
     
-    return []
+    with file_lock(MASTER_LIST_PATH + ".lock"):
+        # Another worker may have appended since the unlocked check
+        keys = refresh_master_list()["keys"]
+        new_items = []
+        seen = set()
+        for item in items:
+            key = item.lower()
+            if key not in keys and key not in seen:
+                seen.add(key)
+                new_items.append(item)
+        if new_items:
+            with open(MASTER_LIST_PATH, "a+b") as f:
+                # Terminate a hand-edited last line so the batch starts on its own line
+                prefix = b""
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        prefix = b"\n"
+                f.write(prefix + "".join(item + "\n" for item in new_items).encode('utf-8'))
+        refresh_master_list()
+    
+    return new_items
 
-def cleanup_old_files():
-    """Clean up old temporary files"""
+def schedule_expiry(path, ttl):
+    """Have the janitor delete path once ttl seconds have passed"""
     try:
-        if os.path.exists(OUTPUT_DIR):
-            for f_name in os.listdir(OUTPUT_DIR):
-                file_path = os.path.join(OUTPUT_DIR, f_name)
-                if os.path.isfile(file_path):
-                    # Remove files older than 1 hour
-                    if time.time() - os.path.getmtime(file_path) > 3600:
-                        os.remove(file_path)
-    except Exception as e:
-        logger.warning(f"Error cleaning up old files: {e}")
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    
+    with janitor_lock:
+        heapq.heappush(janitor_heap, (time.time() + ttl, next(janitor_sequence), path, size))
+        janitor_stats["pending"] += 1
+        janitor_stats["pending_bytes"] += size
+        janitor_lock.notify()
+    ensure_janitor()
 
-def clean_item_name(item_string):
-    """Clean item name by removing minecraft: prefix and other formatting"""
-    if not item_string or not isinstance(item_string, str):
-        return None
+def ensure_janitor():
+    """Start this process's janitor thread if it is not running yet"""
+    global janitor_pid
+    with janitor_lock:
+        # Threads do not survive fork, so each gunicorn worker starts its own
+        if janitor_pid == os.getpid():
+            return
+        janitor_pid = os.getpid()
+    threading.Thread(target=run_janitor, name="janitor", daemon=True).start()
+    logger.info("Janitor started")
+
+def run_janitor():
+    """Delete scheduled artifacts as their deadlines pass and sweep stale files periodically"""
+    next_sweep = time.time()
+    while True:
+        try:
+            with janitor_lock:
+                now = time.time()
+                due = []
+                while janitor_heap and janitor_heap[0][0] <= now and len(due) < JANITOR_BATCH_SIZE:
+                    due.append(heapq.heappop(janitor_heap))
+                
+                if not due and now < next_sweep:
+                    timeout = next_sweep - now
+                    if janitor_heap:
+                        timeout = min(timeout, janitor_heap[0][0] - now)
+                    janitor_lock.wait(timeout)
+                    continue
+            
+            # Deletions happen outside the lock so scheduling never waits on disk I/O
+            for _, _, path, size in due:
+                remove_expired_file(path)
+                with janitor_lock:
+                    janitor_stats["pending"] -= 1
+                    janitor_stats["pending_bytes"] -= size
+            
+            if time.time() >= next_sweep:
+                sweep_expired_files()
+                next_sweep = time.time() + JANITOR_SWEEP_INTERVAL
+        except Exception as e:
+            logger.warning(f"Janitor error: {e}")
+            time.sleep(1)
+
+def remove_expired_file(path):
+    """Delete one expired artifact, recording the bytes reclaimed"""
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except FileNotFoundError:
+        return 0
+    except OSError as e:
+        logger.warning(f"Could not clean up {path}: {e}")
+        return 0
     
-    # Remove quotes
-    item_string = item_string.strip('"\'')
+    with janitor_lock:
+        janitor_stats["reclaimed"] += 1
+        janitor_stats["reclaimed_bytes"] += size
+    return size
+
+def sweep_expired_files():
+    """Delete stale artifacts from the output, temp, job, pack cache, upload and workspace directories"""
+    now = time.time()
+    targets = [
+        # Loose recipe files older than 1 hour
+        (OUTPUT_DIR, lambda name: True, 3600),
+        # Custom downloads built without the pack cache
+        (tempfile.gettempdir(), lambda name: name.startswith("custom_") and name.endswith(".zip"), 3600),
+        # Build job state and results
+        (JOBS_DIR, lambda name: True, BUILD_JOB_TTL),
+        # Partial packs left behind by a crashed worker
+        (PACK_CACHE_DIR, lambda name: name.endswith(".tmp"), 3600),
+        # Chunked catalog uploads that were never completed
+        (CATALOG_UPLOAD_DIR, lambda name: True, CATALOG_UPLOAD_TTL)
+    ]
     
-    # Remove minecraft: prefix
-    if item_string.startswith('minecraft:'):
-        item_string = item_string[10:]  # Remove 'minecraft:' (10 characters)
+    removed = 0
+    for directory, matches, ttl in targets:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and matches(entry.name) and now - entry.stat().st_mtime > ttl:
+                        if remove_expired_file(entry.path):
+                            removed += 1
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Error sweeping {directory}: {e}")
     
-    # Remove any trailing data after : (like damage values)
-    if ':' in item_string:
-        item_string = item_string.split(':')[0]
+    # Workspaces of clients that have not been back within WORKSPACE_TTL
+    try:
+        with os.scandir(WORKSPACES_DIR) as entries:
+            for entry in entries:
+                if entry.is_dir() and now - entry.stat().st_mtime > WORKSPACE_TTL:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Error sweeping {WORKSPACES_DIR}: {e}")
     
-    # Remove any whitespace
-    item_string = item_string.strip()
+    with janitor_lock:
+        janitor_stats["sweeps"] += 1
+    if removed:
+        logger.info(f"Janitor swept {removed} stale file(s)")
+
+def get_workspace(create=False):
+    """The requesting client's workspace paths; create makes its directory on first write"""
+    root = os.path.join(WORKSPACES_DIR, g.client_id)
+    workspace = Workspace(g.client_id, root, os.path.join(root, "last_session.json"),
+                          os.path.join(root, "output.zip"), os.path.join(root, "output"))
+    try:
+        # Touching the directory marks the workspace as recently used for expiry and eviction
+        os.utime(root)
+    except FileNotFoundError:
+        if create:
+            # Every cookieless request could otherwise create one and evict someone else's
+            client_ip = client_address()
+            if not check_rate_limit(client_ip, "workspace"):
+                logger.warning(f"Workspace creation rate limit exceeded for {client_ip}")
+                raise TooManyRequests("Too many new sessions. Please wait before trying again.")
+            if not evict_workspaces(WORKSPACE_MAX_COUNT - 1):
+                raise ServiceUnavailable("Too many active sessions. Please try again later.")
+            os.makedirs(root, exist_ok=True)
+            logger.info(f"Created workspace {g.client_id[:8]}")
+    return workspace
+
+def evict_workspaces(keep):
+    """Delete least recently used idle workspaces until at most keep remain; returns whether that was reached.
     
-    # Filter out problematic items
-    if item_string.lower() in FILTERED_ITEMS:
-        logger.debug(f"Filtered out problematic item: {item_string}")
-        return None
+    Workspaces used within WORKSPACE_EVICT_MIN_IDLE or in the middle of a generate are never evicted.
+    """
+    try:
+        with os.scandir(WORKSPACES_DIR) as entries:
+            workspaces = [(entry.stat().st_mtime, entry.path) for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return True
     
-    # Validate item name (only allow valid Minecraft item characters)
-    if re.match(r'^[a-z0-9_]+$', item_string):
-        return item_string
+    workspaces.sort()
+    excess = len(workspaces) - keep
+    idle_before = time.time() - WORKSPACE_EVICT_MIN_IDLE
+    for mtime, path in workspaces:
+        if excess <= 0 or mtime > idle_before:
+            break
+        try:
+            with open(os.path.join(path, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                shutil.rmtree(path, ignore_errors=True)
+        except BlockingIOError:
+            continue
+        except FileNotFoundError:
+            pass
+        excess -= 1
+        logger.info(f"Evicted workspace {os.path.basename(path)[:8]}")
     
-    return None
+    if excess > 0:
+        logger.warning(f"All {len(workspaces)} workspaces are in use, refusing a new one")
+    return excess <= 0
 
-def parse_json_catalog(content):
-    """Parse JSON catalog file and extract item names"""
-    try:
-        data = json.loads(content)
-        items = []
-        
-        def extract_items_recursive(obj):
-            """Recursively extract items from nested JSON structure"""
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key == "items" and isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, str):
-                                clean_item = clean_item_name(item)
-                                if clean_item:
-                                    items.append(clean_item)
-                    else:
-                        extract_items_recursive(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    extract_items_recursive(item)
-        
-        extract_items_recursive(data)
-        return items
-        
-    except json.JSONDecodeError:
-        logger.error("Invalid JSON format")
-        return []
+def workspace_usage(workspace):
+    """Bytes used by a workspace's files"""
+    total = 0
+    for directory in (workspace.root, workspace.output_dir):
+        try:
+            with os.scandir(directory) as entries:
+                total += sum(entry.stat().st_size for entry in entries if entry.is_file())
+        except FileNotFoundError:
+            continue
+    return total
 
-def parse_text_catalog(content):
-    """Parse text file and extract item names"""
-    items = []
-    lines = content.split('\n')
+def iter_decoded_chunks(stream, max_bytes=None, deadline=None):
+    """Read a binary upload stream as UTF-8 text chunks without loading it whole.
     
-    for line in lines:
-        line = line.strip()
-        if line and not line.startswith('#') and not line.startswith('//'):
-            clean_item = clean_item_name(line)
-            if clean_item:
-                items.append(clean_item)
+    Raises RequestEntityTooLarge past max_bytes and RequestTimeout past the
+    time.monotonic() deadline, so chunked bodies without a length are bounded too.
+    """
+    def check(received):
+        if max_bytes is not None and received > max_bytes:
+            raise RequestEntityTooLarge(f"Request body is larger than {max_bytes:,} bytes")
+        if deadline is not None and time.monotonic() > deadline:
+            raise RequestTimeout("Request took too long")
     
-    return items
+    return iter_decoded_file(stream, check)
 
 @app.before_request
 def validate_request():
     """Validate incoming requests"""
-    # Limit request size to 10MB
-    if request.content_length and request.content_length > 10 * 1024 * 1024:
+    ensure_janitor()
+    
+    # Every browser gets its own workspace, identified by a random id cookie
+    client_id = request.cookies.get(CLIENT_ID_COOKIE, "")
+    g.client_id = client_id if HEX_ID_RE.match(client_id) else uuid.uuid4().hex
+    
+    # Limit request size to 10MB; catalog uploads and generate requests are parsed as a stream
+    limit = {"/upload-catalog": CATALOG_MAX_BYTES, "/api/generate": GENERATE_MAX_BYTES}.get(request.path, MAX_REQUEST_BYTES)
+    if request.content_length and request.content_length > limit:
         return "Request too large", 413
 
 @app.route("/health")
@@ -642,7 +1029,11 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "template_exists": os.path.exists(TEMPLATE_PATH)
+        "template_exists": os.path.exists(TEMPLATE_PATH),
+        "pack_cache": pack_cache_stats,
+        "recipe_cache": dict(recipe_cache_stats, entries=len(recipe_cache)),
+        "pending_jobs": pending_jobs,
+        "janitor": dict(janitor_stats)
     })
 
 @app.route("/upload-catalog", methods=["POST"])
@@ -655,73 +1046,294 @@ def upload_catalog():
         if not files or (len(files) == 1 and files[0].filename == ''):
             return jsonify({"success": False, "error": "No files uploaded"})
         
-        all_extracted_items = []
-        processed_files = []
-        failed_files = []
-        
-        for file in files:
-            if file.filename == '':
-                continue
-                
-            try:
-                # Read file content
-                file_content = file.read().decode('utf-8')
-                
-                # Parse and extract items based on file type
-                file_items = []
-                
-                if file.filename.lower().endswith('.json'):
-                    file_items = parse_json_catalog(file_content)
-                elif file.filename.lower().endswith('.txt'):
-                    file_items = parse_text_catalog(file_content)
-                else:
-                    failed_files.append(f"{file.filename} (unsupported format)")
+        # Files are saved to disk so pool workers can stream them independently
+        temp_dir = tempfile.mkdtemp(prefix="catalog_")
+        cleanup = lambda: shutil.rmtree(temp_dir, ignore_errors=True)
+        try:
+            sources = []
+            for i, file in enumerate(files):
+                if file.filename == '':
                     continue
-                
-                if file_items:
-                    all_extracted_items.extend(file_items)
-                    processed_files.append(f"{file.filename} ({len(file_items)} items)")
-                    logger.info(f"Successfully extracted {len(file_items)} items from {file.filename}")
-                else:
-                    failed_files.append(f"{file.filename} (no valid items found)")
-                    
-            except Exception as e:
-                logger.error(f"Error processing file {file.filename}: {e}")
-                failed_files.append(f"{file.filename} (processing error)")
-                continue
+                path = os.path.join(temp_dir, str(i))
+                file.save(path)
+                sources.append((file.filename, path))
+            
+            # Streaming hands the directory to the response, which removes it when done
+            if request.form.get('stream') == '1':
+                stream, cleanup = stream_catalog_upload(sources, cleanup), None
+                return Response(stream, mimetype='application/x-ndjson')
+            return jsonify(catalog_upload_response(sources))
+        finally:
+            if cleanup:
+                cleanup()
         
-        if not all_extracted_items:
-            return jsonify({"success": False, "error": "No valid items found in any of the uploaded files"})
+    except Exception as e:
+        logger.error(f"Error processing catalog uploads: {e}")
+        return jsonify({"success": False, "error": "Failed to process the uploaded files"})
+
+def iter_catalog_paths(sources):
+    """Parse (filename, path) catalogs, yielding results in upload order as they finish.
+    
+    Several files are spread across the process pool.
+    """
+    if PACK_BUILD_WORKERS > 1 and len(sources) > 1:
+        try:
+            pool = get_process_pool()
+            futures = [pool.submit(parse_catalog_path, filename, path) for filename, path in sources]
+        except Exception as e:
+            logger.warning(f"Worker pool unavailable, parsing catalogs serially: {e}")
+            futures = None
         
+        if futures:
+            for (filename, path), future in zip(sources, futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.warning(f"Catalog worker failed on {filename}, parsing it here: {e}")
+                    yield parse_catalog_path(filename, path)
+            return
+    
+    for filename, path in sources:
+        yield parse_catalog_path(filename, path)
+
+def merge_catalog_result(result, unique_items, processed_files, failed_files):
+    """Fold one parsed file into the running upload totals; returns its item count"""
+    filename, error, file_items, file_total, seconds = result
+    if error:
+        failed_files.append(f"{filename} ({error})")
+        return 0
+    
+    unique_items.update(file_items)
+    processed_files.append(f"{filename} ({file_total} items, {seconds * 1000:.0f} ms)")
+    logger.info(f"Successfully extracted {file_total} items from {filename} in {seconds:.3f}s")
+    return file_total
+
+def catalog_summary(unique_count, total_items, processed_files, failed_files):
+    """Upload response fields other than the item list itself"""
+    if not total_items:
+        return {"success": False, "error": "No valid items found in any of the uploaded files"}
+    
+    # Build success message
+    message_parts = []
+    if processed_files:
+        message_parts.append(f"Successfully processed {len(processed_files)} file(s)")
+        message_parts.append(f"Found {unique_count} unique items")
+        message_parts.append(f"Ready to use: {unique_count} items")
+    
+    message = ". ".join(message_parts)
+    
+    response_data = {
+        "success": True, 
+        "count": unique_count,
+        "total_items": total_items,
+        "unique_items": unique_count,
+        "filtered_items": 0,
+        "processed_files": processed_files,
+        "failed_files": failed_files,
+        "message": message
+    }
+    
+    if failed_files:
+        response_data["warning"] = f"Some files could not be processed: {', '.join(failed_files)}"
+    
+    return response_data
+
+def catalog_upload_response(sources):
+    """Parse (filename, path) catalog sources and build the upload response"""
+    unique_items = set()
+    total_items = 0
+    processed_files = []
+    failed_files = []
+    
+    for result in iter_catalog_paths(sources):
+        total_items += merge_catalog_result(result, unique_items, processed_files, failed_files)
+    
+    response_data = catalog_summary(len(unique_items), total_items, processed_files, failed_files)
+    if response_data["success"]:
         # Remove duplicates and sort
-        unique_items = sorted(list(set(all_extracted_items)))
-        
-        # Build success message
-        message_parts = []
-        if processed_files:
-            message_parts.append(f"Successfully processed {len(processed_files)} file(s)")
-            message_parts.append(f"Found {len(unique_items)} unique items")
-            message_parts.append(f"Ready to use: {len(unique_items)} items")
-        
-        message = ". ".join(message_parts)
-        
-        response_data = {
-            "success": True, 
-            "items": unique_items,
-            "count": len(unique_items),
-            "total_items": len(all_extracted_items),
-            "unique_items": len(unique_items),
-            "filtered_items": 0,
-            "processed_files": processed_files,
-            "failed_files": failed_files,
-            "message": message
-        }
+        response_data["items"] = sorted(unique_items)
+    return response_data
+
+def stream_catalog_upload(sources, cleanup=None):
+    """Yield a catalog upload's response as NDJSON.
+    
+    One {"file": ...} line per file as it is parsed, then {"items": [...]} lines
+    of at most CATALOG_STREAM_BATCH sorted items, then the summary fields of the
+    plain JSON response. cleanup runs once the stream ends or is abandoned.
+    """
+    try:
+        unique_items = set()
+        total_items = 0
+        processed_files = []
+        failed_files = []
         
-        if failed_files:
-            response_data["warning"] = f"Some files could not be processed: {', '.join(failed_files)}"
+        try:
+            for result in iter_catalog_paths(sources):
+                filename, error, _, file_total, seconds = result
+                total_items += merge_catalog_result(result, unique_items, processed_files, failed_files)
+                yield json.dumps({"file": filename, "error": error, "items": file_total, "ms": round(seconds * 1000)}) + "\n"
+        finally:
+            if cleanup:
+                cleanup()
         
-        return jsonify(response_data)
+        summary = catalog_summary(len(unique_items), total_items, processed_files, failed_files)
+        if summary["success"]:
+            unique_items = sorted(unique_items)
+            for start in range(0, len(unique_items), CATALOG_STREAM_BATCH):
+                yield json.dumps({"items": unique_items[start:start + CATALOG_STREAM_BATCH]}) + "\n"
+        yield json.dumps(summary) + "\n"
+    except Exception as e:
+        logger.error(f"Error streaming catalog upload: {e}")
+        yield json.dumps({"success": False, "error": "Failed to process the uploaded files"}) + "\n"
+
+def catalog_upload_paths(upload_id):
+    """Metadata and data file paths for a chunked catalog upload"""
+    base = os.path.join(CATALOG_UPLOAD_DIR, upload_id)
+    return base + ".json", base + ".part"
+
+def read_catalog_upload(upload_id):
+    """Load a chunked upload's metadata, or None if the id is unknown or expired"""
+    if not HEX_ID_RE.match(upload_id):
+        return None
+    meta_path, data_path = catalog_upload_paths(upload_id)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            upload = json.load(f)
+        upload["offset"] = os.path.getsize(data_path)
+        return upload
+    except (IOError, ValueError):
+        return None
+
+def catalog_upload_reserved():
+    """Bytes declared by every live chunked upload; chunks can never grow an upload past its declaration"""
+    total = 0
+    try:
+        with os.scandir(CATALOG_UPLOAD_DIR) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        total += int(json.load(f).get("size", 0))
+                except (IOError, ValueError, TypeError, AttributeError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return total
+
+@app.route("/api/catalog-uploads", methods=["POST"])
+def create_catalog_upload():
+    """Start a chunked, resumable catalog upload for files above the request size limit"""
+    client_ip = client_address()
+    if not check_rate_limit(client_ip, "catalog_upload"):
+        logger.warning(f"Rate limit exceeded for {client_ip}")
+        return jsonify({"success": False, "error": "Too many uploads. Please wait before starting another."}), 429
+    
+    fields = request.get_json(silent=True) or {}
+    filename = fields.get("filename")
+    size = fields.get("size")
+    
+    if not isinstance(filename, str) or not filename.lower().endswith(('.json', '.txt')):
+        return jsonify({"success": False, "error": "Catalog must be a .json or .txt file"}), 400
+    if not isinstance(size, int) or size < 0 or size > CATALOG_MAX_BYTES:
+        return jsonify({"success": False, "error": f"Catalog size must be between 0 and {CATALOG_MAX_BYTES} bytes"}), 413
+    
+    # Space is reserved for the declared size up front, so the total can never overrun the disk
+    if catalog_upload_reserved() + size > CATALOG_UPLOAD_MAX_TOTAL_BYTES:
+        logger.warning(f"Catalog upload storage full, refusing {size} bytes from {client_ip}")
+        return jsonify({"success": False, "error": "Upload storage is full. Please try again later."}), 507
+    
+    try:
+        os.makedirs(CATALOG_UPLOAD_DIR, exist_ok=True)
+        upload = {"id": uuid.uuid4().hex, "filename": os.path.basename(filename), "size": size, "created": time.time()}
+        meta_path, data_path = catalog_upload_paths(upload["id"])
+        open(data_path, 'wb').close()
+        safe_file_write(meta_path, json.dumps(upload))
+        logger.info(f"Catalog upload {upload['id']} started: {upload['filename']} ({size} bytes)")
+        return jsonify(dict(upload, offset=0, chunk_size=MAX_REQUEST_BYTES)), 201
+    except Exception as e:
+        logger.error(f"Error starting catalog upload: {e}")
+        return jsonify({"success": False, "error": "Failed to start upload"}), 500
+
+@app.route("/api/catalog-uploads/<upload_id>", methods=["GET"])
+def get_catalog_upload(upload_id):
+    """Report how many bytes of a chunked upload have arrived so a client can resume"""
+    upload = read_catalog_upload(upload_id)
+    if upload is None:
+        return jsonify({"success": False, "error": "Upload not found"}), 404
+    return jsonify(upload)
+
+@app.route("/api/catalog-uploads/<upload_id>", methods=["PUT"])
+def append_catalog_upload(upload_id):
+    """Append one chunk at ?offset=N; a mismatched offset returns 409 with the current one"""
+    upload = read_catalog_upload(upload_id)
+    if upload is None:
+        return jsonify({"success": False, "error": "Upload not found"}), 404
+    
+    try:
+        offset = int(request.args.get("offset", ""))
+    except ValueError:
+        return jsonify({"success": False, "error": "offset is required"}), 400
+    
+    meta_path, data_path = catalog_upload_paths(upload_id)
+    try:
+        with open(data_path, 'ab') as f:
+            # Retried chunks from the same client must not interleave
+            fcntl.flock(f, fcntl.LOCK_EX)
+            current = f.seek(0, os.SEEK_END)
+            if offset != current:
+                return jsonify(dict(upload, offset=current, success=False, error="Offset mismatch")), 409
+            
+            while True:
+                data = request.stream.read(STREAM_CHUNK_SIZE)
+                if not data:
+                    break
+                if current + len(data) > upload["size"]:
+                    f.truncate(offset)
+                    return jsonify({"success": False, "error": "Chunk exceeds declared size"}), 413
+                f.write(data)
+                current += len(data)
+            f.flush()
+        
+        os.utime(meta_path)
+        return jsonify(dict(upload, offset=current))
+    except Exception as e:
+        logger.error(f"Error appending to catalog upload {upload_id}: {e}")
+        return jsonify({"success": False, "error": "Failed to store chunk"}), 500
+
+@app.route("/api/catalog-uploads/complete", methods=["POST"])
+def complete_catalog_uploads():
+    """Parse finished chunked uploads together, answering like /upload-catalog"""
+    data = request.get_json(silent=True) or {}
+    upload_ids = data.get("upload_ids")
+    if not isinstance(upload_ids, list) or not upload_ids or not all(isinstance(upload_id, str) for upload_id in upload_ids):
+        return jsonify({"success": False, "error": "upload_ids must be a non-empty list"}), 400
+    
+    uploads = []
+    for upload_id in upload_ids:
+        upload = read_catalog_upload(upload_id)
+        if upload is None:
+            return jsonify({"success": False, "error": f"Upload not found: {upload_id}"}), 404
+        if upload["offset"] != upload["size"]:
+            return jsonify(dict(upload, success=False, error="Upload is incomplete")), 409
+        uploads.append(upload)
+    
+    def cleanup():
+        for upload in uploads:
+            for path in catalog_upload_paths(upload["id"]):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    try:
+        sources = [(upload["filename"], catalog_upload_paths(upload["id"])[1]) for upload in uploads]
+        if data.get("stream"):
+            return Response(stream_catalog_upload(sources, cleanup), mimetype='application/x-ndjson')
         
+        response_data = catalog_upload_response(sources)
+        cleanup()
+        return jsonify(response_data)
     except Exception as e:
         logger.error(f"Error processing catalog uploads: {e}")
         return jsonify({"success": False, "error": "Failed to process the uploaded files"})
@@ -732,7 +1344,7 @@ def index():
     error = ""
     
     # Load last session for display
-    last_session = load_last_session()
+    last_session = load_last_session(get_workspace().session_path)
     
     if request.method == "POST":
         try:
@@ -765,208 +1377,197 @@ def index():
                 else:
                     message = "No previous session found."
                     
-                return render_template_string(HTML_TEMPLATE, message=message, error=error)
+                return render_page(message, error)
             
             # Handle normal form submission - Generate recipes
             submitted_items = request.form.getlist("selected")
-            all_items_raw = request.form.get("all_items", "")
+            all_items_raw = request.form.get("all_items")
             
             if not submitted_items:
                 error = "No items selected. Please select at least one item."
-                return render_template_string(HTML_TEMPLATE, message=message, error=error)
+                return render_page(message, error)
             
             # Validate inputs
             submitted_items = validate_item_names(submitted_items)
-            all_items = validate_item_names(all_items_raw.split("\n") if all_items_raw else [])
+            session_rev = request.form.get("session_rev")
+            if all_items_raw is None and session_rev is not None:
+                # The page leaves the list out when it matches its last synced session. If another
+                # tab has saved since, the stored list is not this page's, so nothing is merged
+                if session_rev != str(last_session["rev"]):
+                    logger.info(f"Session moved on since rev {session_rev}, asking for the full item list")
+                    error = "Your session was changed in another tab, so nothing was generated or saved. Please check your items and generate again."
+                    return render_page(message, error)
+                all_items = last_session["items"]
+            else:
+                all_items = validate_item_names(all_items_raw.split("\n") if all_items_raw else [])
             
             if not submitted_items:
                 error = "No items selected. Please select at least one item."
-                return render_template_string(HTML_TEMPLATE, message=message, error=error)
+                return render_page(message, error)
             
             # Sort the items to ensure consistent order
             submitted_items.sort()
             
-            logger.info(f"Form submission: {len(submitted_items)} items selected, {len(all_items)} total items")
-            
-            # Clean up old files
-            cleanup_old_files()
-            
-            # Ensure directories exist
-            os.makedirs(OUTPUT_DIR, exist_ok=True)
-            os.makedirs("data", exist_ok=True)
-
-            # Load template (cached)
-            template = load_template()
-
-            # Clear output directory
-            for f_name in os.listdir(OUTPUT_DIR):
-                file_path = os.path.join(OUTPUT_DIR, f_name)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-
-            # Update master list safely
-            try:
-                master_items = set()
-                if os.path.exists(MASTER_LIST_PATH):
-                    with open(MASTER_LIST_PATH, 'r', encoding='utf-8') as f:
-                        master_items = set(line.strip().lower() for line in f if line.strip())
-
-                new_items = [item for item in submitted_items if item.lower() not in master_items]
-                if new_items:
-                    with open(MASTER_LIST_PATH, "a", encoding='utf-8') as f:
-                        for item in new_items:
-                            f.write(item + "\n")
-            except Exception as e:
-                logger.warning(f"Could not update master list: {e}")
-
-            # Generate recipe files - SEQUENTIAL TRANSFORMATION
-            generated_files = []
-            for i in range(len(submitted_items) - 1):  # Stop at second-to-last item
-                try:
-                    input_item = submitted_items[i]
-                    result_item = submitted_items[i + 1]  # Next item in the list
-                    
-                    if DEBUG_TEMPLATES:
-                        logger.info(f"Processing: {input_item} → {result_item}")
-                    
-                    safe_input = safe_filename(input_item)
-                    safe_result = safe_filename(result_item)
-                    
-                    rendered = template.render(input_item=input_item, result_item=result_item)
-                    
-                    if DEBUG_TEMPLATES:
-                        logger.info(f"Rendered result preview: {rendered[:200]}...")
-                    
-                    filename = f"{safe_input}_to_{safe_result}.json"
-                    file_path = os.path.join(OUTPUT_DIR, filename)
-                    
-                    if safe_file_write(file_path, rendered):
-                        generated_files.append(filename)
-                        logger.info(f"Generated: {filename} ({input_item} → {result_item})")
-                    else:
-                        logger.error(f"Failed to write: {filename}")
-                    
-                except Exception as e:
-                    logger.error(f"Error generating recipe for {input_item} → {result_item}: {e}")
-                    continue
-            
-            # Add the cycle-back recipe (last item → first item)
-            if len(submitted_items) >= 2:
-                try:
-                    input_item = submitted_items[-1]  # Last item
-                    result_item = submitted_items[0]   # First item
-                    
-                    safe_input = safe_filename(input_item)
-                    safe_result = safe_filename(result_item)
-                    
-                    rendered = template.render(input_item=input_item, result_item=result_item)
-                    filename = f"{safe_input}_to_{safe_result}.json"
-                    file_path = os.path.join(OUTPUT_DIR, filename)
-                    
-                    if safe_file_write(file_path, rendered):
-                        generated_files.append(filename)
-                        logger.info(f"Generated cycle-back: {filename} ({input_item} → {result_item})")
-                    
-                except Exception as e:
-                    logger.error(f"Error generating cycle-back recipe for {input_item} → {result_item}: {e}")
-
-            # Always add the transformation table crafting recipe
-            try:
-                table_recipe_content = """{
-    "format_version": "1.12",
-    "minecraft:recipe_shaped": {
-        "description": {
-            "identifier": "transformationtable:transformation_table"
-        },
-        "tags": [
-            "crafting_table"
-        ],
-        "pattern": [
-            "iDi",
-            "iCi",
-            "iii"
-        ],
-        "key": {
-            "i": {
-                "item": "minecraft:iron_ingot"
-            },
-            "D": {
-                "item": "minecraft:diamond"
-            },
-            "C": {
-                "item": "minecraft:crafting_table"
-            }
-        },
-        "result": {
-            "item": "transformationtable:transformation_table",
-            "count": 1
-        }
-    }
-}"""
-                
-                table_recipe_filename = "transformation_table.json"
-                table_recipe_path = os.path.join(OUTPUT_DIR, table_recipe_filename)
-                
-                if safe_file_write(table_recipe_path, table_recipe_content):
-                    generated_files.append(table_recipe_filename)
-                    logger.info("Added transformation table crafting recipe to output")
-                
-            except Exception as e:
-                logger.error(f"Error adding table recipe: {e}")
-
-            if not generated_files:
-                error = "No recipe files were generated successfully."
-                return render_template_string(HTML_TEMPLATE, message=message, error=error)
-
-            # Create ZIP file safely
-            temp_zip = ZIP_PATH + ".tmp"
-            try:
-                with zipfile.ZipFile(temp_zip, "w", zipfile.ZIP_DEFLATED) as zipf:
-                    for filename in generated_files:
-                        file_path = os.path.join(OUTPUT_DIR, filename)
-                        if os.path.exists(file_path):
-                            zipf.write(file_path, arcname=filename)
-                            logger.info(f"Added to ZIP: {filename}")
-                
-                # Atomic rename
-                if os.path.exists(ZIP_PATH):
-                    os.remove(ZIP_PATH)
-                os.rename(temp_zip, ZIP_PATH)
-                
-            except Exception as e:
-                logger.error(f"Error creating ZIP file: {e}")
-                if os.path.exists(temp_zip):
-                    os.remove(temp_zip)
-                error = "Failed to create download package."
-                return render_template_string(HTML_TEMPLATE, message=message, error=error)
-
-            if not os.path.exists(ZIP_PATH) or os.path.getsize(ZIP_PATH) == 0:
-                error = "ZIP file creation failed or is empty."
-                logger.error(error)
-                return render_template_string(HTML_TEMPLATE, message=message, error=error)
-
-            # Save current session
+            logger.info(f"Form submission: {len(submitted_items)} items selected, {len(all_items)} total items")
+            
+            # Update master list safely
             try:
-                save_session(all_items, submitted_items)
+                add_master_items(submitted_items)
             except Exception as e:
-                logger.warning(f"Could not save session: {e}")
+                logger.warning(f"Could not update master list: {e}")
+
+            # One generate at a time per workspace; other clients build in parallel
+            workspace = get_workspace(create=True)
+            with file_lock(os.path.join(workspace.root, ".lock")):
+                generated_files, stats, error = build_workspace_pack(
+                    workspace, submitted_items, last_session["selected"])
+                if error:
+                    return render_page(message, error)
+
+                # Save current session
+                try:
+                    save_session(all_items, submitted_items, workspace.session_path)
+                except Exception as e:
+                    logger.warning(f"Could not save session: {e}")
 
-            zip_size = os.path.getsize(ZIP_PATH)
-            message = f"✅ Successfully generated {len(generated_files)-1} transformation recipe(s) from {len(submitted_items)} items ({zip_size:,} bytes). <a href='/download' style='color: #90ee90; text-decoration: underline;'>Download ZIP</a>"
-            logger.info(f"ZIP created successfully: {zip_size} bytes")
+            # Each loose file costs an open, write and close on top of the ZIP itself,
+            # which in memory is a single open and write however many recipes it holds
+            if WRITE_LOOSE_RECIPES:
+                io_note = f"{stats['loose_files']} loose file(s) also written"
+            else:
+                io_note = f"assembled in memory, {stats['loose_files'] * 3:,} file syscalls and {stats['loose_bytes']:,} bytes of loose writes avoided"
+            message = f"✅ Successfully generated {len(generated_files)-1} transformation recipe(s) from {len(submitted_items)} items ({stats['zip_bytes']:,} bytes; {stats['reused']} reused, {stats['rebuilt']} rebuilt; {io_note}). <a href='/download' style='color: #90ee90; text-decoration: underline;'>Download ZIP</a>"
+            logger.info(f"ZIP created successfully: {stats['zip_bytes']} bytes, {stats['reused']} entries reused, {stats['rebuilt']} rebuilt, {io_note}")
 
         except ValueError as e:
             error = f"Invalid input: {str(e)}"
             logger.error(f"Validation error: {e}")
+        except HTTPException as e:
+            error = e.description
         except Exception as e:
             error = f"An unexpected error occurred. Please try again."
             logger.error(f"Error in recipe generation: {e}", exc_info=True)
 
-    return render_template_string(HTML_TEMPLATE, message=message, error=error)
+    if not message and not error:
+        return static_page_response(static_pages["index"])
+    return render_page(message, error)
+
+def build_workspace_pack(workspace, submitted_items, previous_selected):
+    """Build a workspace's recipe ZIP for the selected items.
+    
+    The archive is assembled in memory from the compressed entries and hits
+    the disk in a single write; loose recipe files are only written when
+    WRITE_LOOSE_RECIPES is on. Returns (generated_files, stats, error); error
+    is a user-facing message when nothing was replaced.
+    """
+    # Generate recipe files - SEQUENTIAL TRANSFORMATION, including the cycle-back recipe
+    pairs = recipe_pairs(submitted_items)
+    
+    if WRITE_LOOSE_RECIPES:
+        filenames = set()
+        for input_item, result_item in pairs:
+            try:
+                filenames.add(recipe_entry_name('standard', input_item, result_item))
+            except ValueError:
+                continue
+        filenames.add("transformation_table.json")
+
+        # Remove output files that are no longer part of the selection
+        os.makedirs(workspace.output_dir, exist_ok=True)
+        for f_name in os.listdir(workspace.output_dir):
+            file_path = os.path.join(workspace.output_dir, f_name)
+            if f_name not in filenames and os.path.isfile(file_path):
+                os.remove(file_path)
+    elif os.path.isdir(workspace.output_dir):
+        # Left over from a debug run; it would no longer match the ZIP
+        shutil.rmtree(workspace.output_dir, ignore_errors=True)
+
+    # Recipes for pairs that were already in the last generated ZIP are copied
+    # from it byte-for-byte; only changed pairs are rendered
+    previous_zip, previous_entries = open_previous_pack(workspace.zip_path, previous_selected)
+    rebuilt = iter_compressed_recipes([pair for pair in pairs if pair not in previous_entries], 'standard')
+    
+    generated_files = []
+    stats = {"reused": 0, "rebuilt": 0, "zip_bytes": 0, "loose_files": 0, "loose_bytes": 0}
+    date_time = time.localtime(time.time())[:6]
+
+    def add_entry(zipf, filename, entry, reused=False):
+        zip_write_raw(zipf, filename, entry, date_time)
+        generated_files.append(filename)
+        stats["loose_files"] += 1
+        stats["loose_bytes"] += entry.file_size
+        if WRITE_LOOSE_RECIPES:
+            write_loose_recipe(workspace.output_dir, filename, entry, reused=reused)
+
+    # Create ZIP file safely
+    buffer = io.BytesIO()
+    temp_zip = workspace.zip_path + ".tmp"
+    try:
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+            zipf.comment = pack_comment(submitted_items)
+            
+            for input_item, result_item in pairs:
+                result = None
+                reused = False
+                zinfo = previous_entries.get((input_item, result_item))
+                if zinfo is not None:
+                    try:
+                        result = zinfo.filename, read_raw_entry(previous_zip, zinfo)
+                        reused = True
+                        stats["reused"] += 1
+                    except (OSError, zipfile.BadZipFile) as e:
+                        logger.warning(f"Could not reuse {zinfo.filename}, rebuilding: {e}")
+                        result = build_recipe_chunk([(input_item, result_item)], 'standard')[0]
+                        stats["rebuilt"] += result is not None
+                else:
+                    result = next(rebuilt)
+                    stats["rebuilt"] += result is not None
+                
+                if result is None:
+                    # Error already logged while rendering
+                    continue
+                
+                filename, entry = result
+                add_entry(zipf, filename, entry, reused=reused)
+                if DEBUG_TEMPLATES:
+                    logger.info(f"{'Reused' if reused else 'Generated'}: {filename} ({input_item} → {result_item})")
+
+            # Always add the transformation table crafting recipe
+            add_entry(zipf, "transformation_table.json", get_static_bundle()["table_recipe"])
+        
+        if previous_zip is not None:
+            previous_zip.close()
+        stats["zip_bytes"] = buffer.tell()
+        
+        # The new ZIP replaces the old one, so only count the old one's size once
+        usage = workspace_usage(workspace) + stats["zip_bytes"]
+        if os.path.exists(workspace.zip_path):
+            usage -= os.path.getsize(workspace.zip_path)
+        if usage > WORKSPACE_MAX_BYTES:
+            logger.warning(f"Workspace {workspace.client_id[:8]} over quota: {usage:,} bytes")
+            if WRITE_LOOSE_RECIPES:
+                shutil.rmtree(workspace.output_dir, ignore_errors=True)
+            return [], stats, f"Selection too large: the generated files exceed the {WORKSPACE_MAX_BYTES:,} byte workspace limit."
+        
+        with open(temp_zip, "wb") as f:
+            f.write(buffer.getbuffer())
+        
+        # Atomic rename
+        os.replace(temp_zip, workspace.zip_path)
+        
+    except Exception as e:
+        logger.error(f"Error creating ZIP file: {e}")
+        if previous_zip is not None:
+            previous_zip.close()
+        if os.path.exists(temp_zip):
+            os.remove(temp_zip)
+        return [], stats, "Failed to create download package."
+    
+    return generated_files, stats, None
 
 @app.route("/download-custom", methods=["POST"])
 def download_custom():
-    client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR', 'unknown'))
+    client_ip = client_address()
     
     # Rate limiting
     if not check_rate_limit(client_ip):
@@ -974,664 +1575,645 @@ def download_custom():
         return "Too many requests. Please wait before downloading again.", 429
     
     try:
-        format_type = request.form.get('format', 'standard')
-        items_json = request.form.get('items', '[]')
+        format_type, selected_items, error = parse_custom_pack_request(request.form)
+        if error:
+            return error
         
-        # Validate format type
-        valid_formats = ['standard', 'datapack', 'behavior_pack', 'complete_pack', 'custom']
-        if format_type not in valid_formats:
-            return "Invalid format type", 400
+        download_filename = pack_download_name(format_type)
         
-        try:
-            selected_items = json.loads(items_json)
-            selected_items = validate_item_names(selected_items)
-            selected_items.sort()
-            
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Invalid items JSON: {e}")
-            return "Invalid items data", 400
-        
-        logger.info(f"Custom download requested: format={format_type}, items={len(selected_items)}")
+        # Identical requests are served straight from the pack cache
+        cache_key = pack_cache_key(format_type, selected_items)
+        cached_file = pack_cache_open(cache_key)
+        if cached_file:
+            logger.info(f"Pack cache hit: {cache_key[:12]} ({format_type}, {len(selected_items)} items)")
+            return send_pack(cached_file, download_filename)
         
         # Add progress logging for large batches
         if len(selected_items) > 500:
             logger.info(f"Processing large batch of {len(selected_items)} items - this may take a moment...")
         
-        if not selected_items:
-            return "No items selected", 400
-            
-        if len(selected_items) < 2:
-            return "Need at least 2 items to create transformation chain", 400
-            
-        # Keep the 5000 limit as requested
-        if len(selected_items) > 5000:
-            return "Too many items selected. Please select fewer than 5000 items for performance reasons.", 400
+        # Streaming mode sends entries as they are compressed, with no temp file
+        stream = request.form.get('stream', '1' if STREAM_DOWNLOADS else '0') == '1'
+        if stream:
+            logger.info(f"Streaming custom ZIP: {format_type}, {len(selected_items)} items")
+            response = Response(stream_custom_pack(selected_items, format_type, cache_key),
+                                mimetype='application/zip')
+            response.headers.set('Content-Disposition', 'attachment', filename=download_filename)
+            return response
             
         # Ensure directories exist
         os.makedirs(OUTPUT_DIR, exist_ok=True)
         os.makedirs("data", exist_ok=True)
         
-        # Load cached template
-        template = load_template()
-        
-        # Clean up old files
-        cleanup_old_files()
-        
-        # Create custom structure based on format  
-        # Use temp directory for better isolation
-        import tempfile
-        temp_dir = tempfile.gettempdir()
-        custom_zip_path = os.path.join(temp_dir, f"custom_{format_type}_{int(time.time())}.zip")
-        
+        custom_zip_path = pack_build_path(cache_key, format_type)
         try:
-            with zipfile.ZipFile(custom_zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                # Generate recipe files - SEQUENTIAL TRANSFORMATION
-                successful_recipes = 0
-                failed_recipes = 0
-                
-                for i in range(len(selected_items) - 1):  # Stop at second-to-last item
-                    try:
-                        input_item = selected_items[i]
-                        result_item = selected_items[i + 1]  # Next item in the list
-                        
-                        safe_input = safe_filename(input_item)
-                        safe_result = safe_filename(result_item)
-                        
-                        rendered = template.render(input_item=input_item, result_item=result_item)
-                        filename = f"{safe_input}_to_{safe_result}.json"
-                        
-                        # Determine file path based on format
-                        if format_type == 'datapack':
-                            arcname = f"data/transformation/recipes/{filename}"
-                        elif format_type == 'behavior_pack':
-                            arcname = f"Transformation Table BP/recipes/{filename}"
-                        elif format_type == 'complete_pack':
-                            arcname = f"Transformation Table BP/recipes/{filename}"
-                        elif format_type == 'custom':
-                            category = get_item_category(input_item)
-                            arcname = f"{category}/{filename}"
-                        else:
-                            arcname = filename
-                        
-                        zipf.writestr(arcname, rendered)
-                        successful_recipes += 1
-                        
-                        # Log progress for large batches
-                        if len(selected_items) > 500 and (i + 1) % 100 == 0:
-                            logger.info(f"Progress: {i + 1}/{len(selected_items)-1} recipes generated")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing item {input_item} → {result_item}: {e}")
-                        failed_recipes += 1
-                        continue
-                
-                # Add the cycle-back recipe (last item → first item)
-                if len(selected_items) >= 2:
-                    try:
-                        input_item = selected_items[-1]  # Last item
-                        result_item = selected_items[0]   # First item
-                        
-                        safe_input = safe_filename(input_item)
-                        safe_result = safe_filename(result_item)
-                        
-                        rendered = template.render(input_item=input_item, result_item=result_item)
-                        filename = f"{safe_input}_to_{safe_result}.json"
-                        
-                        # Determine file path based on format
-                        if format_type == 'datapack':
-                            arcname = f"data/transformation/recipes/{filename}"
-                        elif format_type == 'behavior_pack':
-                            arcname = f"Transformation Table BP/recipes/{filename}"
-                        elif format_type == 'complete_pack':
-                            arcname = f"Transformation Table BP/recipes/{filename}"
-                        elif format_type == 'custom':
-                            category = get_item_category(input_item)
-                            arcname = f"{category}/{filename}"
-                        else:
-                            arcname = filename
-                        
-                        zipf.writestr(arcname, rendered)
-                        successful_recipes += 1
-                        logger.info(f"Added cycle-back recipe: {input_item} → {result_item}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing cycle-back recipe {input_item} → {result_item}: {e}")
-                        failed_recipes += 1
-                
-                logger.info(f"Recipe generation complete: {successful_recipes} successful, {failed_recipes} failed")
-                
-                # ALWAYS add the transformation table crafting recipe for behavior packs and complete packs
-                if format_type in ['behavior_pack', 'complete_pack']:
-                    try:
-                        table_recipe_content = """{
-    "format_version": "1.12",
-    "minecraft:recipe_shaped": {
-        "description": {
-            "identifier": "transformationtable:transformation_table"
-        },
-        "tags": [
-            "crafting_table"
-        ],
-        "pattern": [
-            "iDi",
-            "iCi",
-            "iii"
-        ],
-        "key": {
-            "i": {
-                "item": "minecraft:iron_ingot"
-            },
-            "D": {
-                "item": "minecraft:diamond"
-            },
-            "C": {
-                "item": "minecraft:crafting_table"
-            }
-        },
-        "result": {
-            "item": "transformationtable:transformation_table",
-            "count": 1
-        }
-    }
-}"""
-                        
-                        if format_type == 'behavior_pack':
-                            table_recipe_arcname = "Transformation Table BP/recipes/transformation_table.json"
-                        elif format_type == 'complete_pack':
-                            table_recipe_arcname = "Transformation Table BP/recipes/transformation_table.json"
-                        
-                        zipf.writestr(table_recipe_arcname, table_recipe_content)
-                        successful_recipes += 1
-                        logger.info("Added transformation table crafting recipe to pack")
-                        
-                    except Exception as e:
-                        logger.error(f"Error adding table recipe to pack: {e}")
-                        failed_recipes += 1
-                        
-                # Add metadata files based on format
-                try:
-                    if format_type == 'datapack':
-                        add_datapack_metadata(zipf)
-                    elif format_type == 'behavior_pack':
-                        add_behavior_pack_metadata(zipf)
-                    elif format_type == 'complete_pack':
-                        add_complete_pack_metadata(zipf)
-                    elif format_type == 'custom':
-                        add_custom_metadata(zipf, selected_items)
-                except Exception as e:
-                    logger.error(f"Error adding metadata: {e}")
-        
+            zip_size = build_custom_pack(selected_items, format_type, custom_zip_path)
         except Exception as e:
             logger.error(f"Error creating custom ZIP: {e}")
-            if os.path.exists(custom_zip_path):
-                os.remove(custom_zip_path)
             return "Error creating download package", 500
         
-        if not os.path.exists(custom_zip_path) or os.path.getsize(custom_zip_path) == 0:
-            logger.error("Custom ZIP creation failed or empty")
-            return "Download package creation failed", 500
-        
-        zip_size = os.path.getsize(custom_zip_path)
-        logger.info(f"Custom ZIP created: {custom_zip_path} ({zip_size:,} bytes)")
-        
-        # Clean up file after sending
-        def remove_file():
-            try:
-                if os.path.exists(custom_zip_path):
-                    os.remove(custom_zip_path)
-            except:
-                pass
-        
-        # Schedule cleanup (simple approach - use Celery in production)
-        import threading
-        cleanup_timer = threading.Timer(300, remove_file)  # Clean up after 5 minutes
-        cleanup_timer.start()
-        
-        # Set proper download filename based on format
-        if format_type == 'behavior_pack':
-            download_filename = 'Transformation_Table_BP.zip'
-        elif format_type == 'complete_pack':
-            download_filename = 'Transformation_Table_Complete_Pack.zip'
+        if PACK_CACHE_MAX_BYTES > 0:
+            custom_zip_path = pack_cache_put(cache_key, custom_zip_path)
+            logger.info(f"Custom ZIP created and cached: {cache_key[:12]} ({zip_size:,} bytes)")
         else:
-            download_filename = f"minecraft_transformation_recipes_{format_type}.zip"
+            logger.info(f"Custom ZIP created: {custom_zip_path} ({zip_size:,} bytes)")
+            
+            # Clean up after 5 minutes
+            schedule_expiry(custom_zip_path, 300)
         
-        return send_file(custom_zip_path, as_attachment=True, 
-                        download_name=download_filename, 
-                        mimetype='application/zip')
+        return send_pack(custom_zip_path, download_filename)
                         
     except Exception as e:
         logger.error(f"Error in custom download: {e}", exc_info=True)
         return "Internal server error", 500
 
-def get_item_category(item):
-    """Categorize items for custom folder structure"""
-    if not item:
-        return 'misc'
-    
-    item_lower = item.lower()
-    
-    if any(word in item_lower for word in ['ore', 'raw_']):
-        return 'ores'
-    elif any(word in item_lower for word in ['ingot', 'nugget']):
-        return 'metals'
-    elif any(word in item_lower for word in ['wood', 'log', 'plank']):
-        return 'wood'
-    elif any(word in item_lower for word in ['stone', 'cobble', 'granite', 'diorite']):
-        return 'stone'
-    elif any(word in item_lower for word in ['diamond', 'emerald', 'ruby', 'sapphire']):
-        return 'gems'
-    elif any(word in item_lower for word in ['food', 'bread', 'meat', 'apple']):
-        return 'food'
-    else:
-        return 'misc'
-
-def add_datapack_metadata(zipf):
-    """Add pack.mcmeta for Java datapack"""
-    logger.info("Adding datapack metadata...")
-    pack_mcmeta = {
-        "pack": {
-            "pack_format": 10,
-            "description": "Transformation Recipes Datapack"
-        }
-    }
-    zipf.writestr("pack.mcmeta", json.dumps(pack_mcmeta, indent=2))
-
-def add_behavior_pack_metadata(zipf):
-    """Add manifest.json and pack structure for Bedrock behavior pack"""
-    logger.info("Adding behavior pack metadata...")
+def parse_custom_pack_request(form):
+    """Validate the format and items fields of a custom pack request.
     
-    # FIXED: Using the exact same UUIDs as your working uncrafting table pack
-    manifest = {
-        "format_version": 2,
-        "metadata": {
-            "authors": ["foamwrap"]
-        },
-        "header": {
-            "name": "Transformation Table",
-            "description": "By foamwrap",
-            "min_engine_version": [1, 20, 60],
-            "uuid": "b6f04080-1c3d-4bc0-b8f2-4624078d108f",  # Same as uncrafting table structure
-            "version": [3, 0, 0]
-        },
-        "modules": [
-            {
-                "type": "data",
-                "uuid": "56df8307-2bf9-4a4e-a7d6-fe057ed5a075",  # Same as uncrafting table structure
-                "version": [3, 0, 0]
-            }
-        ],
-        "dependencies": [
-            {
-                "uuid": "54ac9ad2-a9c7-4596-bacb-73336ba88451",  # Same as uncrafting table structure
-                "version": [3, 0, 0]
-            }
-        ]
-    }
-    zipf.writestr("Transformation Table BP/manifest.json", json.dumps(manifest, indent=4))
-    
-    # FIXED: Block definition matching your working uncrafting table exactly
-    transformation_table_block = {
-        "format_version": "1.20.60",
-        "minecraft:block": {
-            "description": {
-                "identifier": "transformationtable:transformation_table",
-                "menu_category": {
-                    "category": "equipment"
-                },
-                "is_experimental": False,
-                "traits": {
-                    "minecraft:placement_direction": {
-                        "enabled_states": ["minecraft:cardinal_direction"]
-                    }
-                }
-            },
-            "components": {
-                "minecraft:crafting_table": {
-                    "crafting_tags": ["transformation_table"],  # Fixed to match identifier
-                    "grid_size": 3,
-                    "table_name": "Transformation"
-                },
-                "minecraft:collision_box": {
-                    "size": [16, 16, 16],
-                    "origin": [-8, 0, -8]
-                },
-                "minecraft:geometry": "geometry.transformation_table",
-                "minecraft:material_instances": {
-                    "up": {
-                        "texture": "tt_top",
-                        "render_method": "opaque"
-                    },
-                    "*": {
-                        "texture": "tt_side",
-                        "render_method": "opaque"
-                    },
-                    "north": {
-                        "texture": "tt_front",
-                        "render_method": "opaque"
-                    }
-                },
-                "minecraft:flammable": True,  # Fixed: should be boolean, not string
-                "minecraft:destructible_by_mining": {
-                    "seconds_to_destroy": 1
-                },
-                "minecraft:destructible_by_explosion": {
-                    "explosion_resistance": 7.5
-                },
-                "minecraft:selection_box": {
-                    "origin": [-8, 0, -8],
-                    "size": [16, 16, 16]
-                }
-            },
-            "permutations": [
-                {
-                    "condition": "query.block_state('minecraft:cardinal_direction')=='south'",
-                    "components": {
-                        "minecraft:transformation": {
-                            "rotation": [0, 0, 0]
-                        }
-                    }
-                },
-                {
-                    "condition": "query.block_state('minecraft:cardinal_direction')=='east'",
-                    "components": {
-                        "minecraft:transformation": {
-                            "rotation": [0, 90, 0]
-                        }
-                    }
-                },
-                {
-                    "condition": "query.block_state('minecraft:cardinal_direction')=='west'",
-                    "components": {
-                        "minecraft:transformation": {
-                            "rotation": [0, -90, 0]
-                        }
-                    }
-                },
-                {
-                    "condition": "query.block_state('minecraft:cardinal_direction')=='north'",
-                    "components": {
-                        "minecraft:transformation": {
-                            "rotation": [0, 180, 0]
-                        }
-                    }
-                }
-            ]
-        }
-    }
-    zipf.writestr("Transformation Table BP/blocks/transformation_table.json", 
-                  json.dumps(transformation_table_block, indent=2))
+    Returns (format_type, sorted_items, None), or (None, None, (message, status)) when invalid.
+    """
+    format_type = form.get('format', 'standard')
+    items_json = form.get('items', '[]')
+    if not isinstance(format_type, str):
+        return None, None, ("Invalid format type", 400)
+    
+    # Validate format type
+    if format_type not in PACK_FORMATS:
+        return None, None, ("Invalid format type", 400)
     
-    # Copy pack icon
     try:
-        if os.path.exists(PACK_ICON_PATH):
-            with open(PACK_ICON_PATH, 'rb') as icon_file:
-                pack_icon_content = icon_file.read()
-            zipf.writestr("Transformation Table BP/pack_icon.png", pack_icon_content)
-            logger.info(f"Added pack icon from {PACK_ICON_PATH} (size: {len(pack_icon_content)} bytes)")
-        else:
-            logger.warning(f"Pack icon not found at {PACK_ICON_PATH}")
-    except Exception as e:
-        logger.error(f"Error adding pack icon: {e}")
+        # JSON API callers send a real list, form posts send it encoded
+        selected_items = json.loads(items_json) if isinstance(items_json, str) else items_json
+        selected_items = validate_item_names(selected_items)
+        selected_items.sort()
+        
+    except (json.JSONDecodeError, ValueError) as e:
+        logger.error(f"Invalid items JSON: {e}")
+        return None, None, ("Invalid items data", 400)
+    
+    logger.info(f"Custom download requested: format={format_type}, items={len(selected_items)}")
+    
+    if not selected_items:
+        return None, None, ("No items selected", 400)
+        
+    if len(selected_items) < 2:
+        return None, None, ("Need at least 2 items to create transformation chain", 400)
+        
+    # Keep the 5000 limit as requested
+    if len(selected_items) > 5000:
+        return None, None, ("Too many items selected. Please select fewer than 5000 items for performance reasons.", 400)
     
-    logger.info("Behavior pack metadata complete")
+    return format_type, selected_items, None
 
-def add_complete_pack_metadata(zipf):
-    """Add both Behavior Pack and Resource Pack metadata and files"""
-    logger.info("Adding complete pack metadata (BP + RP)...")
+def parse_generate_options(args):
+    """Validate the query parameters of /api/generate.
     
+    Returns (format_type, mode, None), or (None, None, message) when invalid.
+    """
+    mode = args.get('response', 'pack')
     try:
-        # First add the Behavior Pack components
-        add_behavior_pack_metadata(zipf)
-        logger.info("Behavior Pack metadata added successfully")
-    except Exception as e:
-        logger.error(f"Error adding behavior pack metadata: {e}")
-        raise
+        format_type = resolve_pack_format(args.get('format', 'standard'), args.get('layout', 'flat'))
+    except ValueError as e:
+        return None, None, str(e)
+    if mode not in ('pack', 'key'):
+        return None, None, "response must be pack or key"
+    if mode == 'key' and PACK_CACHE_MAX_BYTES <= 0:
+        return None, None, "response=key needs the pack cache, which is disabled"
+    return format_type, mode, None
+
+@app.route("/api/generate", methods=["POST"])
+def api_generate():
+    """Generate a pack from a streamed item list.
+    
+    The body is application/json ({"items": [...]} or a bare array) or application/x-ndjson (one
+    JSON string per line) and is validated as it arrives, within GENERATE_MAX_BYTES
+    and GENERATE_MAX_SECONDS. Query parameters: format, layout (flat or categories)
+    and response: pack streams the ZIP back, key builds it into the pack cache and
+    returns its key for GET /api/packs/<key>.
+    """
+    client_ip = client_address()
+    
+    # Rate limiting
+    if not check_rate_limit(client_ip, "generate"):
+        logger.warning(f"Rate limit exceeded for {client_ip}")
+        return jsonify({"success": False, "error": "Too many requests. Please wait before generating again."}), 429
+    
+    format_type, mode, error = parse_generate_options(request.args)
+    if error:
+        return jsonify({"success": False, "error": error}), 400
     
+    if request.mimetype == 'application/json':
+        parser = iter_json_item_list
+    elif request.mimetype == 'application/x-ndjson':
+        parser = iter_ndjson_items
+    else:
+        return jsonify({"success": False, "error": "Send application/json or application/x-ndjson"}), 415
+    
+    start = time.monotonic()
+    deadline = start + GENERATE_MAX_SECONDS
     try:
-        # RP Manifest
-        rp_manifest = {
-            "format_version": 2,
-            "metadata": {"authors": ["foamwrap"]},
-            "header": {
-                "name": "Transformation Table",
-                "description": "By foamwrap",
-                "min_engine_version": [1, 20, 60],
-                "uuid": "54ac9ad2-a9c7-4596-bacb-73336ba88451",
-                "version": [3, 0, 0]
-            },
-            "modules": [
-                {
-                    "type": "resources",
-                    "uuid": "d1e248e1-bcd8-4bfe-b632-650602f94f32",
-                    "version": [3, 0, 0]
-                }
-            ],
-            "dependencies": [
-                {
-                    "uuid": "b6f04080-1c3d-4bc0-b8f2-4624078d108f",
-                    "version": [3, 0, 0]
-                }
-            ]
-        }
-        zipf.writestr("Transformation Table RP/manifest.json", json.dumps(rp_manifest, indent=4))
-        logger.info("RP manifest added successfully")
+        chunks = iter_decoded_chunks(request.stream, GENERATE_MAX_BYTES, deadline)
+        selected_items = sorted(set(parser(chunks, clean=validate_item_names)))
+        
+        if len(selected_items) < 2:
+            return jsonify({"success": False, "error": "Need at least 2 items to create transformation chain"}), 400
+        logger.info(f"Generate API: format={format_type}, mode={mode}, {len(selected_items)} items read in {time.monotonic() - start:.3f}s")
+        
+        cache_key = pack_cache_key(format_type, selected_items)
+        cached_file = pack_cache_open(cache_key)
+        if mode == 'pack':
+            if cached_file:
+                logger.info(f"Pack cache hit: {cache_key[:12]} ({format_type}, {len(selected_items)} items)")
+                response = send_pack(cached_file, pack_download_name(format_type))
+            else:
+                # The body limit bounds reading; the same deadline bounds the streamed build
+                response = Response(stream_custom_pack(selected_items, format_type, cache_key, deadline),
+                                    mimetype='application/zip')
+                response.headers.set('Content-Disposition', 'attachment', filename=pack_download_name(format_type))
+            # Without the pack cache the key could never be fetched from /api/packs
+            if PACK_CACHE_MAX_BYTES > 0:
+                response.headers["X-Pack-Key"] = cache_key
+            return response
+        
+        if cached_file:
+            with cached_file:
+                size = os.fstat(cached_file.fileno()).st_size
+        else:
+            def check_deadline(recipes_written, bytes_written):
+                if time.monotonic() > deadline:
+                    raise RequestTimeout("Pack build took too long")
+            
+            build_path = pack_build_path(cache_key, format_type)
+            size = build_custom_pack(selected_items, format_type, build_path, progress=check_deadline)
+            pack_cache_put(cache_key, build_path)
+            logger.info(f"Generate API pack cached: {cache_key[:12]} in {time.monotonic() - start:.3f}s")
+        
+        return jsonify({
+            "success": True,
+            "key": cache_key,
+            "format": format_type,
+            "items": len(selected_items),
+            "size": size,
+            "url": f"/api/packs/{cache_key}"
+        })
+    
+    except RequestEntityTooLarge as e:
+        return jsonify({"success": False, "error": e.description}), 413
+    except RequestTimeout as e:
+        logger.warning(f"Generate API timed out after {time.monotonic() - start:.1f}s")
+        return jsonify({"success": False, "error": e.description}), 408
+    except ValueError as e:
+        logger.error(f"Generate API validation error: {e}")
+        return jsonify({"success": False, "error": f"Invalid input: {e}"}), 400
     except Exception as e:
-        logger.error(f"Error adding RP manifest: {e}")
-        raise
+        logger.error(f"Error in generate API: {e}", exc_info=True)
+        return jsonify({"success": False, "error": "Failed to generate pack"}), 500
+
+@app.route("/api/packs/<key>")
+def get_cached_pack(key):
+    """Download a pack built by /api/generate?response=key"""
+    if not PACK_KEY_RE.match(key):
+        return jsonify({"success": False, "error": "Pack not found"}), 404
+    
+    cached_file = pack_cache_open(key)
+    if not cached_file:
+        return jsonify({"success": False, "error": "Pack not found or expired from the cache. Please generate it again."}), 404
+    
+    # Keys are content hashes, so a key's pack never changes
+    return cache_immutable(send_pack(cached_file, f"transformation_pack_{key[:12]}.zip"), 86400)
+
+def pack_build_path(cache_key, format_type):
+    """Where to build a custom pack before it is sent or cached"""
+    # Build next to the cache so the finished archive can be renamed into it,
+    # otherwise use temp directory for better isolation
+    if PACK_CACHE_MAX_BYTES > 0:
+        os.makedirs(PACK_CACHE_DIR, exist_ok=True)
+        return os.path.join(PACK_CACHE_DIR, f"{cache_key}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_dir = tempfile.gettempdir()
+    return os.path.join(temp_dir, f"custom_{format_type}_{int(time.time())}_{threading.get_ident()}.zip")
+
+@app.route("/api/jobs", methods=["POST"])
+def create_build_job():
+    """Queue a custom pack build and return its job id for progress polling"""
+    global pending_jobs
+    client_ip = client_address()
+    
+    # Rate limiting
+    if not check_rate_limit(client_ip, "jobs"):
+        logger.warning(f"Rate limit exceeded for {client_ip}")
+        return jsonify({"success": False, "error": "Too many requests. Please wait before building again."}), 429
     
     try:
-        # FIXED: RP blocks.json with correct namespace to match your working example
-        rp_blocks = {
-            "format_version": [1, 1, 0],
-            "transformationtable:transformation_table": {  # FIXED: Match the block identifier
-                "sound": "wood",
-                "textures": {
-                    "up": "tt_top",
-                    "side": "tt_side"
-                }
-            }
+        fields = request.get_json(silent=True) if request.is_json else request.form
+        format_type, selected_items, error = parse_custom_pack_request(fields or {})
+        if error:
+            message, status = error
+            return jsonify({"success": False, "error": message}), status
+        
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "pid": os.getpid(),
+            "format": format_type,
+            "items": len(selected_items),
+            "recipes_total": len(recipe_pairs(selected_items)) + (1 if format_type in ['behavior_pack', 'complete_pack'] else 0),
+            "recipes_rendered": 0,
+            "bytes_written": 0,
+            "created": now,
+            "started": None,
+            "finished": None,
+            "error": None
         }
-        zipf.writestr("Transformation Table RP/blocks.json", json.dumps(rp_blocks, indent=4))
-        logger.info("RP blocks.json added successfully")
+        
+        # Identical requests complete immediately from the pack cache
+        cache_key = pack_cache_key(format_type, selected_items)
+        cached_path = pack_cache_get(cache_key)
+        if cached_path:
+            job.update(status="done", recipes_rendered=job["recipes_total"], started=now, finished=now,
+                       bytes_written=os.path.getsize(cached_path), result_path=cached_path)
+            write_job(job)
+            logger.info(f"Build job {job['id']} served from pack cache: {cache_key[:12]}")
+            return jsonify(job_status(job)), 202
+        
+        with job_executor_lock:
+            if pending_jobs >= BUILD_JOB_MAX_PENDING:
+                return jsonify({"success": False, "error": "Build queue is full. Please try again shortly."}), 503
+            pending_jobs += 1
+        
+        try:
+            write_job(job)
+            status = job_status(job)
+            get_job_executor().submit(run_build_job, job, selected_items, cache_key)
+        except Exception:
+            # run_build_job never started, so it will not give the slot back
+            with job_executor_lock:
+                pending_jobs -= 1
+            raise
+        logger.info(f"Build job {job['id']} queued: format={format_type}, items={len(selected_items)}")
+        return jsonify(status), 202
+        
     except Exception as e:
-        logger.error(f"Error adding RP blocks.json: {e}")
-        raise
+        logger.error(f"Error creating build job: {e}", exc_info=True)
+        return jsonify({"success": False, "error": "Failed to create build job"}), 500
+
+@app.route("/api/jobs/<job_id>")
+def get_build_job(job_id):
+    """Report live progress of a build job"""
+    job = read_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify(job_status(job))
+
+@app.route("/api/jobs/<job_id>/result")
+def get_build_job_result(job_id):
+    """Download the pack produced by a finished build job"""
+    job = read_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
     
+    if job["status"] == "failed":
+        return jsonify(job_status(job)), 500
+    if job["status"] != "done":
+        return jsonify(job_status(job)), 409
+    
+    # Opened rather than checked, since the pack cache may evict the result at any moment
     try:
-        # Language files
-        zipf.writestr("Transformation Table RP/texts/languages.json", '[\n\t"en_US"\n]')
-        zipf.writestr("Transformation Table RP/texts/en_US.lang", 
-                      "tile.transformationtable:transformation_table.name=Transformation Table")
-        logger.info("Language files added successfully")
-    except Exception as e:
-        logger.error(f"Error adding language files: {e}")
-        raise
+        result_file = open(job.get("result_path") or "", 'rb')
+    except OSError:
+        return jsonify({"success": False, "error": "Job result has expired. Please build it again."}), 410
     
+    # A job's result never changes, so the browser may keep it as long as the job lives
+    return cache_immutable(send_pack(result_file, pack_download_name(job["format"])), BUILD_JOB_TTL)
+
+def get_job_executor():
+    """Return this process's background build pool, creating it on first use"""
+    global job_executor, job_executor_pid
+    with job_executor_lock:
+        if job_executor is None or job_executor_pid != os.getpid():
+            job_executor = ThreadPoolExecutor(max_workers=BUILD_JOB_WORKERS, thread_name_prefix="build-job")
+            job_executor_pid = os.getpid()
+        return job_executor
+
+def job_path(job_id):
+    """Location of a build job's state file"""
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+def write_job(job):
+    """Persist job state atomically so any worker process can report it"""
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    job["updated"] = time.time()
+    temp_path = f"{job_path(job['id'])}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(job, f)
+    os.replace(temp_path, job_path(job["id"]))
+
+def read_job(job_id):
+    """Load a build job's state, or None if the id is unknown"""
+    if not HEX_ID_RE.match(job_id):
+        return None
     try:
-        # Terrain texture
-        terrain_texture = {
-            "num_mip_levels": 4,
-            "padding": 8,
-            "resource_pack_name": "Transformation Table",
-            "texture_name": "atlas.terrain",
-            "texture_data": {
-                "tt_side": {
-                    "textures": "textures/blocks/transformation_table_side"
-                },
-                "tt_top": {
-                    "textures": "textures/blocks/transformation_table_top"
-                },
-                "tt_front": {
-                    "textures": "textures/blocks/transformation_table_front"
-                }
-            }
-        }
-        zipf.writestr("Transformation Table RP/textures/terrain_texture.json", 
-                      json.dumps(terrain_texture, indent=4))
-        logger.info("Terrain texture added successfully")
-    except Exception as e:
-        logger.error(f"Error adding terrain texture: {e}")
-        raise
+        with open(job_path(job_id), 'r', encoding='utf-8') as f:
+            job = json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return None
     
+    # Jobs run on threads of the worker that queued them; a recycled, crashed or hung
+    # worker leaves its jobs unfinished forever, so report them failed instead
+    if job["status"] in ("queued", "running"):
+        stalled = job["status"] == "running" and time.time() - job.get("updated", 0) > BUILD_JOB_STALL_SECONDS
+        if stalled or not process_alive(job.get("pid")):
+            job.update(status="failed", error="Build was interrupted. Please start it again.")
+    return job
+
+def process_alive(pid):
+    """Whether a process with this pid is still running"""
+    if not pid:
+        return False
     try:
-        # Geometry
-        geometry = {
-            "format_version": "1.12.0",
-            "minecraft:geometry": [
-                {
-                    "description": {
-                        "identifier": "geometry.transformation_table",
-                        "texture_width": 16,
-                        "texture_height": 16,
-                        "visible_bounds_width": 2,
-                        "visible_bounds_height": 2.5,
-                        "visible_bounds_offset": [0, 0.75, 0]
-                    },
-                    "bones": [
-                        {
-                            "name": "root",
-                            "pivot": [0, 0, 0],
-                            "cubes": [
-                                {
-                                    "origin": [-8, 0, -8],
-                                    "size": [16, 16, 16],
-                                    "uv": {
-                                        "north": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "north"},
-                                        "east": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "east"},
-                                        "south": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "south"},
-                                        "west": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "west"},
-                                        "up": {"uv": [16, 16], "uv_size": [-16, -16], "material_instance": "up"},
-                                        "down": {"uv": [16, 16], "uv_size": [-16, -16], "material_instance": "down"}
-                                    }
-                                }
-                            ]
-                        }
-                    ]
-                }
-            ]
-        }
-        zipf.writestr("Transformation Table RP/models/blocks/transformation_table.geo.json", 
-                      json.dumps(geometry, indent=4))
-        logger.info("Geometry added successfully")
-    except Exception as e:
-        logger.error(f"Error adding geometry: {e}")
-        raise
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def job_status(job):
+    """Public view of a build job, with an ETA extrapolated from progress so far"""
+    eta_seconds = None
+    if job["status"] == "running" and job["recipes_rendered"] and job["started"]:
+        elapsed = time.time() - job["started"]
+        remaining = job["recipes_total"] - job["recipes_rendered"]
+        eta_seconds = round(elapsed / job["recipes_rendered"] * remaining, 1)
+    elif job["status"] == "done":
+        eta_seconds = 0
     
+    def iso(timestamp):
+        return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+    
+    return {
+        "success": job["status"] != "failed",
+        "job_id": job["id"],
+        "status": job["status"],
+        "format": job["format"],
+        "items": job["items"],
+        "recipes_total": job["recipes_total"],
+        "recipes_rendered": job["recipes_rendered"],
+        "bytes_written": job["bytes_written"],
+        "eta_seconds": eta_seconds,
+        "created": iso(job["created"]),
+        "started": iso(job["started"]),
+        "finished": iso(job["finished"]),
+        "error": job["error"],
+        "status_url": f"/api/jobs/{job['id']}",
+        "result_url": f"/api/jobs/{job['id']}/result"
+    }
+
+def run_build_job(job, selected_items, cache_key):
+    """Build a job's pack in the background, reporting progress through its state file"""
+    global pending_jobs
+    format_type = job["format"]
+    build_path = None
     try:
-        # Copy pack icon to RP as well
-        if os.path.exists(PACK_ICON_PATH):
-            with open(PACK_ICON_PATH, 'rb') as icon_file:
-                pack_icon_content = icon_file.read()
-            zipf.writestr("Transformation Table RP/pack_icon.png", pack_icon_content)
-            logger.info("Added pack icon to Resource Pack")
+        job.update(status="running", started=time.time())
+        write_job(job)
+        
+        last_write = [job["started"]]
+        
+        def report(recipes_rendered, bytes_written):
+            job["recipes_rendered"] = recipes_rendered
+            job["bytes_written"] = bytes_written
+            now = time.time()
+            if now - last_write[0] >= BUILD_JOB_PROGRESS_INTERVAL:
+                last_write[0] = now
+                write_job(job)
+        
+        if PACK_CACHE_MAX_BYTES > 0:
+            build_path = pack_build_path(cache_key, format_type)
         else:
-            logger.warning(f"Pack icon not found at {PACK_ICON_PATH}")
+            build_path = os.path.join(JOBS_DIR, f"{job['id']}.zip.tmp")
+        zip_size = build_custom_pack(selected_items, format_type, build_path, progress=report)
+        
+        if PACK_CACHE_MAX_BYTES > 0:
+            result_path = pack_cache_put(cache_key, build_path)
+        else:
+            result_path = os.path.join(JOBS_DIR, f"{job['id']}.zip")
+            os.replace(build_path, result_path)
+            schedule_expiry(result_path, BUILD_JOB_TTL)
+        
+        job.update(status="done", bytes_written=zip_size, finished=time.time(), result_path=result_path)
+        logger.info(f"Build job {job['id']} finished: {zip_size:,} bytes in {job['finished'] - job['started']:.2f}s")
+        
     except Exception as e:
-        logger.error(f"Error adding RP pack icon: {e}")
-        # Don't raise, continue without icon
-    
-    # Add real texture files with detailed logging
-    texture_files = [
-        ('textures/blocks/transformation_table_front.png', 'Transformation Table RP/textures/blocks/transformation_table_front.png'),
-        ('textures/blocks/transformation_table_side.png', 'Transformation Table RP/textures/blocks/transformation_table_side.png'),
-        ('textures/blocks/transformation_table_top.png', 'Transformation Table RP/textures/blocks/transformation_table_top.png')
-    ]
+        logger.error(f"Build job {job['id']} failed: {e}", exc_info=True)
+        job.update(status="failed", finished=time.time(), error="Error creating download package")
+        if build_path and os.path.exists(build_path):
+            os.remove(build_path)
+    finally:
+        with job_executor_lock:
+            pending_jobs -= 1
+        write_job(job)
+
+def pack_download_name(format_type):
+    """Download filename for a pack format"""
+    if format_type == 'behavior_pack':
+        return 'Transformation_Table_BP.zip'
+    elif format_type == 'complete_pack':
+        return 'Transformation_Table_Complete_Pack.zip'
+    else:
+        return f"minecraft_transformation_recipes_{format_type}.zip"
+
+def cache_immutable(response, max_age):
+    """Let the browser keep a response whose content never changes for max_age seconds"""
+    response.cache_control.no_cache = None
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    return response
+
+def send_pack(zip_file, download_filename):
+    """Send a finished pack, given as a path or an already open file, held open so eviction cannot race the response"""
+    if isinstance(zip_file, str):
+        zip_file = open(zip_file, 'rb')
+    return send_file(zip_file, as_attachment=True,
+                    download_name=download_filename,
+                    mimetype='application/zip')
+
+class ZipStreamSink:
+    """Write-only, unseekable file object collecting ZIP output for a streaming response.
+    
+    zipfile falls back to data descriptors when it cannot seek; raw entries carry
+    their final header instead. Either way each entry can be sent as soon as it is
+    compressed. Output can also be teed into a spool file; the download never
+    depends on it, so a failing spool is dropped and spool_failed is set.
+    """
     
-    logger.info("Starting texture file processing...")
-    logger.info(f"Current working directory: {os.getcwd()}")
-    logger.info(f"Files in current directory: {os.listdir('.')}")
+    def __init__(self, spool=None):
+        self.chunks = []
+        self.buffered = 0
+        self.spool = spool
+        self.spool_failed = False
     
-    if os.path.exists('textures'):
-        logger.info(f"Textures directory exists. Contents: {os.listdir('textures')}")
-        if os.path.exists('textures/blocks'):
-            logger.info(f"Textures/blocks directory contents: {os.listdir('textures/blocks')}")
-        else:
-            logger.warning("textures/blocks directory does not exist")
-    else:
-        logger.warning("textures directory does not exist")
+    def write(self, data):
+        data = bytes(data)
+        if data:
+            self.chunks.append(data)
+            self.buffered += len(data)
+            if self.spool:
+                try:
+                    self.spool.write(data)
+                except OSError as e:
+                    logger.warning(f"Pack spool failed, streaming without caching: {e}")
+                    self.spool = None
+                    self.spool_failed = True
+        return len(data)
     
-    for local_path, zip_path in texture_files:
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.buffered = 0
+        return data
+
+def stream_custom_pack(selected_items, format_type, cache_key=None, deadline=None):
+    """Generate a custom pack as response chunks, caching it once complete.
+    
+    Past the optional time.monotonic() deadline the build stops with RequestTimeout.
+    """
+    spool_path = None
+    spool = None
+    if cache_key and PACK_CACHE_MAX_BYTES > 0:
+        # Per thread, so identical concurrent streams never share a spool file
+        spool_path = pack_build_path(cache_key, format_type)
         try:
-            logger.info(f"Processing texture: {local_path}")
-            if os.path.exists(local_path):
-                with open(local_path, 'rb') as texture_file:
-                    texture_content = texture_file.read()
-                zipf.writestr(zip_path, texture_content)
-                logger.info(f"Successfully added real texture: {local_path} -> {zip_path} ({len(texture_content)} bytes)")
-            else:
-                # Fall back to placeholder if texture file doesn't exist
-                placeholder_png = create_placeholder_texture()
-                zipf.writestr(zip_path, placeholder_png)
-                logger.warning(f"Texture not found at {local_path}, using placeholder")
-        except Exception as e:
-            logger.error(f"Error processing texture {local_path}: {e}")
-            # Add placeholder on error
+            spool = open(spool_path, 'wb')
+        except OSError as e:
+            logger.warning(f"Pack spool unavailable, streaming without caching: {e}")
+    
+    sink = ZipStreamSink(spool)
+    completed = False
+    try:
+        date_time = time.localtime(time.time())[:6]
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for arcname, entry in iter_recipe_entries(selected_items, format_type):
+                zip_write_raw(zipf, arcname, entry, date_time)
+                if sink.buffered >= STREAM_CHUNK_SIZE:
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise RequestTimeout("Pack build took too long")
+                    yield sink.drain()
+            write_pack_metadata(zipf, selected_items, format_type, date_time)
+        yield sink.drain()
+        completed = True
+    except Exception as e:
+        # Re-raised so the server drops the connection: ending cleanly would hand the
+        # client a truncated ZIP with status 200, this way the download visibly fails
+        logger.error(f"Error streaming custom ZIP: {e}", exc_info=True)
+        raise
+    finally:
+        if spool:
             try:
-                placeholder_png = create_placeholder_texture()
-                zipf.writestr(zip_path, placeholder_png)
-                logger.info(f"Added placeholder for {zip_path} due to error")
-            except Exception as e2:
-                logger.error(f"Error creating placeholder for {zip_path}: {e2}")
+                spool.close()
+            except OSError as e:
+                logger.warning(f"Pack spool failed, not caching: {e}")
+                sink.spool_failed = True
+            if completed and not sink.spool_failed:
+                pack_cache_put(cache_key, spool_path)
+                logger.info(f"Streamed pack cached: {cache_key[:12]}")
+            elif os.path.exists(spool_path):
+                os.remove(spool_path)
+
+def pack_comment(items):
+    """ZIP comment recording the template and selection a generated pack was built from"""
+    digest = hashlib.sha256(json.dumps(items).encode('utf-8')).hexdigest()
+    return f"template={template_fingerprint()};items={digest}".encode('ascii')
+
+def open_previous_pack(zip_path, previous_items):
+    """Open the last generated ZIP and index its reusable recipe entries by pair.
     
-    logger.info("Complete pack metadata added (BP + RP)")
+    Returns (zipf, entries) where entries maps (input_item, result_item) to the
+    entry's central directory record. Nothing is reusable unless the archive's
+    comment shows it was built from exactly previous_items with the current template.
+    """
+    previous_items = sorted(previous_items)
+    try:
+        zipf = zipfile.ZipFile(zip_path)
+    except (OSError, zipfile.BadZipFile):
+        return None, {}
+    
+    if zipf.comment != pack_comment(previous_items):
+        zipf.close()
+        return None, {}
+    
+    # Pairs whose filenames collide cannot be told apart, so never reuse them
+    names = {}
+    for pair in recipe_pairs(previous_items):
+        try:
+            name = recipe_entry_name('standard', *pair)
+        except ValueError:
+            continue
+        names[name] = None if name in names else pair
+    
+    entries = {}
+    for name, pair in names.items():
+        zinfo = zipf.NameToInfo.get(name)
+        if pair and zinfo is not None and zinfo.compress_type == zipfile.ZIP_DEFLATED and not zinfo.flag_bits & 0x1:
+            entries[pair] = zinfo
+    return zipf, entries
 
-def create_placeholder_texture():
-    """Create a simple placeholder texture for the block faces"""
-    # Minimal 16x16 PNG file (transparent placeholder)
-    return b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x10\x00\x00\x00\x10\x08\x06\x00\x00\x00\x1f\xf3\xffa\x00\x00\x00\x1dIDATx\x9cc\xf8\x0f\x00\x01\x01\x01\x00\x18\xdd\x8d\xb4\x1c\x00\x00\x00\x00IEND\xaeB`\x82'
+def read_raw_entry(zipf, zinfo):
+    """Read an entry's compressed bytes as stored, without inflating them"""
+    fp = zipf.fp
+    fp.seek(zinfo.header_offset)
+    header = fp.read(30)
+    if len(header) != 30 or header[:4] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"Bad local file header for {zinfo.filename}")
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    fp.seek(zinfo.header_offset + 30 + name_length + extra_length)
+    data = fp.read(zinfo.compress_size)
+    if len(data) != zinfo.compress_size:
+        raise zipfile.BadZipFile(f"Truncated data for {zinfo.filename}")
+    return CompressedEntry(zinfo.CRC, zinfo.file_size, data)
 
-def add_custom_metadata(zipf, items):
-    """Add README for custom structure"""
+def write_loose_recipe(output_dir, filename, entry, reused=False):
+    """Write a recipe from its compressed entry into output_dir, which must exist.
+    
+    Reused entries keep the copy the previous generate already wrote.
+    """
+    file_path = os.path.join(output_dir, filename)
+    if reused and os.path.exists(file_path):
+        return True
     try:
-        readme_content = f"""# Custom Transformation Recipe Pack
-
-This pack contains {len(items)-1} transformation recipes organized by category.
-
-## Transformation Chain:
-"""
-        # Show the transformation chain
-        for i in range(len(items) - 1):
-            readme_content += f"{items[i]} → {items[i+1]}\n"
-        
-        readme_content += f"""
-## Folder Structure:
-- ores/ - Ore-related items
-- metals/ - Ingots and metal items  
-- wood/ - Wood and wooden items
-- stone/ - Stone and rock items
-- gems/ - Precious gems and crystals
-- food/ - Food and consumable items
-- misc/ - Everything else
-
-## Installation:
-Place the recipe files in your Minecraft data folder according to your needs.
-
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Total items in chain: {len(items)}
-"""
-        zipf.writestr("README.md", readme_content)
-        logger.info("Added custom metadata README")
-    except Exception as e:
-        logger.error(f"Error adding custom metadata: {e}")
+        with open(file_path, 'wb') as f:
+            f.write(zlib.decompress(entry.data, -15))
+        return True
+    except OSError as e:
+        logger.error(f"Failed to write file {file_path}: {e}")
+        return False
 
 @app.route("/download")
 def download_zip():
     """Download the basic recipe ZIP"""
     try:
-        if not os.path.exists(ZIP_PATH):
+        zip_path = get_workspace().zip_path
+        if not os.path.exists(zip_path):
             logger.warning("ZIP file not found for download")
             return "ZIP file not found. Please generate recipes first.", 404
         
         # Check file size is reasonable
-        file_size = os.path.getsize(ZIP_PATH)
+        file_size = os.path.getsize(zip_path)
         if file_size == 0:
             logger.error("ZIP file is empty")
             return "ZIP file is empty. Please regenerate recipes.", 404
         
         logger.info(f"Downloading ZIP file: {file_size:,} bytes")
-        return send_file(ZIP_PATH, as_attachment=True, 
+        # send_file answers If-None-Match with 304 from the file's ETag
+        response = send_file(zip_path, as_attachment=True, 
                         download_name="minecraft_transformation_recipes.zip", 
                         mimetype='application/zip')
+        response.cache_control.private = True
+        return response
     except Exception as e:
         logger.error(f"Error in download: {e}")
         return "Download failed. Please try again.", 500
@@ -1640,7 +2222,7 @@ def download_zip():
 def get_last_session():
     """API endpoint to get last session data"""
     try:
-        session_data = load_last_session()
+        session_data = load_last_session(get_workspace().session_path)
         return jsonify(session_data)
     except Exception as e:
         logger.error(f"Error getting last session: {e}")
@@ -1662,64 +2244,205 @@ def update_session():
         selected = validate_item_names(selected)
         
         # Save the session
-        save_session(items, selected)
+        session_path = get_workspace(create=True).session_path
+        save_session(items, selected, session_path)
         
-        return jsonify({"success": True, "message": "Session updated successfully"})
+        return jsonify({"success": True, "message": "Session updated successfully", "rev": load_last_session(session_path)["rev"]})
     except ValueError as e:
         logger.error(f"Validation error updating session: {e}")
         return jsonify({"success": False, "error": f"Invalid data: {str(e)}"})
+    except HTTPException as e:
+        return jsonify({"success": False, "error": e.description}), e.code
     except Exception as e:
         logger.error(f"Error updating session: {e}")
         return jsonify({"success": False, "error": "Failed to save session"})
 
+def session_records_since(rev, session_path):
+    """Valid journal records after rev in order, or None if the journal no longer covers them all"""
+    with session_state_lock:
+        state = refresh_session_state(session_path)
+        if rev == state["seq"]:
+            return []
+        if rev < state["snapshot_seq"] or rev > state["seq"]:
+            return None
+        
+        try:
+            with open(session_path + ".journal", 'rb') as f:
+                lines = f.read(state["journal_offset"]).splitlines()
+        except IOError:
+            return None
+    
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+            if record["seq"] <= rev:
+                continue
+            if record["seq"] != rev + len(records) + 1:
+                return None
+            for field, add_key, remove_key in SESSION_DELTA_FIELDS:
+                for key in (field, add_key, remove_key):
+                    if key in record:
+                        validate_item_names(record[key])
+        except (ValueError, KeyError, TypeError):
+            # A skipped record can't be replayed by the client either
+            return None
+        records.append(record)
+    return records
+
+@app.route("/api/session")
+def get_session():
+    """Session state, or only the journal records after ?since=<rev> when the journal still has them"""
+    try:
+        session_path = get_workspace().session_path
+        since = request.args.get("since", type=int)
+        if since is not None:
+            records = session_records_since(since, session_path)
+            if records is not None:
+                return jsonify({"rev": since + len(records), "deltas": records})
+        
+        return jsonify(load_last_session(session_path))
+    except Exception as e:
+        logger.error(f"Error getting session: {e}")
+        return jsonify({"success": False, "error": "Failed to load session"}), 500
+
+@app.route("/api/session", methods=["POST"])
+def apply_session_delta():
+    """Apply {"rev", "add", "remove", "select", "deselect"} to the session at revision rev.
+    
+    Only the changed names are validated. A stale rev gets 409 with the full
+    current state so the client can rebase its changes and retry.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("rev"), int):
+        return jsonify({"success": False, "error": "rev is required"}), 400
+    
+    try:
+        changes = {}
+        for _, add_key, remove_key in SESSION_DELTA_FIELDS:
+            for key in (add_key, remove_key):
+                values = validate_item_names(data.get(key, []))
+                if values:
+                    changes[key] = values
+    except ValueError as e:
+        logger.error(f"Validation error updating session: {e}")
+        return jsonify({"success": False, "error": f"Invalid data: {str(e)}"}), 400
+    
+    rev = data["rev"]
+    timestamp = datetime.now().isoformat()
+    
+    def make_record(state):
+        if state["seq"] != rev:
+            return None
+        return dict(changes, seq=rev + 1, ts=timestamp)
+    
+    try:
+        session_path = get_workspace(create=True).session_path
+        record, journal_size = append_session_record(session_path, make_record)
+        if record is None:
+            return jsonify(dict(load_last_session(session_path), success=False, error="Session revision mismatch")), 409
+        
+        if journal_size >= SESSION_JOURNAL_COMPACT_BYTES:
+            request_session_compaction(session_path)
+        logger.info(f"Session delta applied at rev {record['seq']}: " + ", ".join(f"{len(values)} {key}" for key, values in changes.items()))
+        return jsonify({"success": True, "rev": record["seq"], "timestamp": timestamp})
+    except HTTPException as e:
+        return jsonify({"success": False, "error": e.description}), e.code
+    except Exception as e:
+        logger.error(f"Error applying session delta: {e}")
+        return jsonify({"success": False, "error": "Failed to save session"}), 500
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return render_template_string(HTML_TEMPLATE, 
-                                message="", 
-                                error="Page not found."), 404
+    return static_page_response(static_pages["not_found"], 404)
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
     logger.error(f"Internal server error: {error}")
-    return render_template_string(HTML_TEMPLATE, 
-                                message="", 
-                                error="Internal server error. Please try again."), 500
+    return static_page_response(static_pages["internal_error"], 500)
 
 @app.after_request
 def add_security_headers(response):
     """Add security headers to all responses"""
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+    # Routes with cacheable content set their own policy; nothing else is ever stored
+    if "Cache-Control" not in response.headers:
+        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "DENY"
     response.headers["X-XSS-Protection"] = "1; mode=block"
+    
+    # Sliding expiry, matching how long the workspace itself is kept
+    if "client_id" in g:
+        response.set_cookie(CLIENT_ID_COOKIE, g.client_id, max_age=WORKSPACE_TTL, httponly=True, samesite="Lax")
+    return response
+
+def gzip_stream(chunks):
+    """Gzip a streamed body, flushing after every chunk so the client sees each one as it is produced"""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        # Run the wrapped stream's cleanup when the client goes away mid-response
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+@app.after_request
+def compress_response(response):
+    """Gzip text responses for clients that accept it"""
+    if (response.status_code < 200 or response.status_code in (204, 304) or response.direct_passthrough
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add("Accept-Encoding")
+    if request.accept_encodings.best_match(["gzip"]) is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = gzip_stream(response.response)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        response.set_data(gzip.compress(data, COMPRESS_LEVEL, mtime=0))
+    response.headers["Content-Encoding"] = "gzip"
     return response
 
 # Cleanup function for startup
 def startup_cleanup():
     """Clean up old files on startup"""
     try:
-        # Clean up old custom ZIP files
-        if os.path.exists("data"):
-            for filename in os.listdir("data"):
-                if filename.startswith("custom_") and filename.endswith(".zip"):
-                    file_path = os.path.join("data", filename)
-                    try:
-                        # Remove files older than 1 hour
-                        if time.time() - os.path.getmtime(file_path) > 3600:
-                            os.remove(file_path)
-                            logger.info(f"Cleaned up old file: {filename}")
-                    except Exception as e:
-                        logger.warning(f"Could not clean up {filename}: {e}")
-        
-        # Clean up output directory
-        cleanup_old_files()
-        
+        sweep_expired_files()
     except Exception as e:
         logger.warning(f"Error in startup cleanup: {e}")
+    
+    # Fold journals left by the previous run into their snapshots so workers replay nothing
+    try:
+        with os.scandir(WORKSPACES_DIR) as entries:
+            for entry in entries:
+                session_path = os.path.join(entry.path, "last_session.json")
+                if entry.is_dir() and file_stamp(session_path + ".journal"):
+                    compact_session_journal(session_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not compact session journals: {e}")
+
+# Build the static asset bundle at import so gunicorn --preload shares it with every worker
+try:
+    get_static_bundle()
+except Exception as e:
+    logger.warning(f"Could not prebuild static pack assets: {e}")
 
 if __name__ == "__main__":
     # Ensure directories exist
@@ -1736,7 +2459,7 @@ if __name__ == "__main__":
     logger.info(f"Pack icon path: {PACK_ICON_PATH}")
     logger.info(f"Texture directory: {TEXTURE_DIR}")
     logger.info(f"Debug templates: {DEBUG_TEMPLATES}")
-    logger.info(f"Filtered items: {len(FILTERED_ITEMS)} items")
+    logger.info(f"Filter rules: {get_item_filter().rules} rules from {FILTER_RULES_PATH}")
     
     # Check for required files
     if not os.path.exists(TEMPLATE_PATH):
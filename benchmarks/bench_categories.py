@@ -0,0 +1,66 @@
+"""Benchmark the Aho-Corasick category classifier against priority-ordered substring scans.
+
+Run from the repository root:
+
+    python benchmarks/bench_categories.py [items] [categories]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+
+def random_word(low, high):
+    return "".join(random.choice(string.ascii_lowercase[:12] + "_") for _ in range(random.randint(low, high)))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    category_count = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    
+    random.seed(0)
+    config = {"default": "misc", "categories": [
+        {"name": f"category_{i}", "priority": random.randint(0, 50), "keywords": [random_word(3, 6) for _ in range(4)]}
+        for i in range(category_count)
+    ]}
+    items = [random_word(8, 24) for _ in range(count)]
+    
+    # Reference: the hard-coded approach, one any() scan per category in priority order
+    ordered = sorted(enumerate(config["categories"]), key=lambda rule: (-rule[1]["priority"], rule[0]))
+    def naive_category(item):
+        for _, rule in ordered:
+            if any(word in item for word in rule["keywords"]):
+                return rule["name"]
+        return config["default"]
+    
+    start = time.perf_counter()
+    classifier = engine.compile_category_rules(config)
+    compile_elapsed = time.perf_counter() - start
+    engine.category_classifier = classifier
+    engine.category_classifier_checked = float("inf")
+    
+    start = time.perf_counter()
+    expected = [naive_category(item) for item in items]
+    naive_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    cold = [engine.get_item_category(item) for item in items]
+    cold_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    warm = [engine.get_item_category(item) for item in items]
+    warm_elapsed = time.perf_counter() - start
+    
+    assert cold == expected and warm == expected, "Classifier disagrees with the reference scan"
+    
+    print(f"Categories: {category_count} ({len(classifier.transitions)} automaton states, compiled in {compile_elapsed * 1000:.1f} ms)")
+    print(f"Items:      {count}")
+    print(f"Naive:      {naive_elapsed * 1000:.1f} ms")
+    print(f"Automaton:  {cold_elapsed * 1000:.1f} ms ({naive_elapsed / cold_elapsed:.1f}x)")
+    print(f"Memoized:   {warm_elapsed * 1000:.1f} ms ({naive_elapsed / warm_elapsed:.1f}x)")
+
+if __name__ == "__main__":
+    main()
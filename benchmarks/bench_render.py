@@ -0,0 +1,53 @@
+"""Benchmark the compiled recipe renderer against Jinja's Template.render.
+
+Run from the repository root:
+
+    python benchmarks/bench_render.py [item_count]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+
+def time_chain(render, items, rounds=5):
+    """Best wall time over several rounds for rendering the whole chain"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(len(items) - 1):
+            render(items[i], items[i + 1])
+        render(items[-1], items[0])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    items = sorted(f"benchmark_item_{i}" for i in range(count))
+    
+    template = engine.load_template()
+    compiled = engine.compile_recipe_renderer(engine.load_template_source())
+    if compiled is None:
+        print("Template is not supported by the compiled renderer; Jinja is used at runtime")
+        return
+    
+    def render_jinja(input_item, result_item):
+        return template.render(input_item=input_item, result_item=result_item).encode('utf-8')
+    
+    # Outputs must be byte-for-byte identical before timings mean anything
+    for i in range(len(items) - 1):
+        assert compiled(items[i], items[i + 1]) == render_jinja(items[i], items[i + 1])
+    
+    jinja_time = time_chain(render_jinja, items)
+    compiled_time = time_chain(compiled, items)
+    
+    print(f"Recipes rendered: {count}")
+    print(f"Template.render:  {jinja_time * 1000:8.2f} ms total, {jinja_time / count * 1e6:6.2f} us/recipe")
+    print(f"Compiled:         {compiled_time * 1000:8.2f} ms total, {compiled_time / count * 1e6:6.2f} us/recipe")
+    print(f"Speedup:          {jinja_time / compiled_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Check that importing the engine stays cheap and never pulls in the web stack.
+
+Runs `python -X importtime -c "import engine"` in fresh interpreters and fails
+(exit status 1) if any run imports a forbidden module, or if the best cumulative
+import time of the engine exceeds the budget.
+
+Run from the repository root:
+
+    python benchmarks/check_import_time.py [budget_ms]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the engine must leave to the web app, or import only on first use
+FORBIDDEN_MODULES = ['flask', 'werkzeug', 'jinja2', 'concurrent.futures.process', 'multiprocessing']
+
+def import_profile():
+    """Imported module names and the engine's cumulative import time in microseconds"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import engine"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 150.0
+    runs = 5
+    
+    best = None
+    leaked = set()
+    for _ in range(runs):
+        modules = import_profile()
+        leaked.update(name for name in modules if name.split('.')[0] in FORBIDDEN_MODULES or name in FORBIDDEN_MODULES)
+        elapsed = modules["engine"] / 1000
+        best = elapsed if best is None else min(best, elapsed)
+    
+    print(f"Import:    engine in {best:.1f} ms (best of {runs}), budget {budget_ms:.0f} ms")
+    print(f"Leaked:    {', '.join(sorted(leaked)) or 'none'}")
+    
+    if leaked or best > budget_ms:
+        print("FAILED: engine import is over budget or pulls in heavy modules", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Build packs offline from a manifest of jobs, spread across every core.
+
+    python cli.py manifest.json [--workers N] [--verbose]
+
+The manifest is a JSON list of jobs, or {"jobs": [...]}. Each job names an
+item list file (a JSON array, {"items": [...]}, or one item per line), an
+output path, and optionally a format, layout (flat or categories) and name:
+
+    {"jobs": [{"name": "survival", "items": "lists/survival.txt",
+               "format": "datapack", "output": "out/survival.zip"}]}
+
+Relative paths are resolved against the manifest's directory. Packs are built
+by the same engine as the web app's custom downloads, which this never imports.
+The template, rules, icon and textures are read from beside engine.py unless
+their environment variables (TEMPLATE_PATH and friends) point elsewhere.
+"""
+import argparse, json, logging, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import engine
+
+def load_manifest(path):
+    """Read and validate a jobs manifest; raises ValueError describing the first bad job"""
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    jobs = manifest.get("jobs") if isinstance(manifest, dict) else manifest
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError("manifest must be a non-empty list of jobs or {\"jobs\": [...]}")
+    
+    base = os.path.dirname(os.path.abspath(path))
+    resolved = []
+    for position, job in enumerate(jobs, 1):
+        if not isinstance(job, dict) or not isinstance(job.get("items"), str) or not isinstance(job.get("output"), str):
+            raise ValueError(f"job #{position} needs \"items\" and \"output\" paths")
+        try:
+            format_type = engine.resolve_pack_format(job.get("format", "standard"), job.get("layout", "flat"))
+        except ValueError as e:
+            raise ValueError(f"job #{position}: {e}")
+        output = os.path.join(base, job["output"])
+        resolved.append({
+            "name": str(job.get("name") or os.path.splitext(os.path.basename(output))[0]),
+            "items": os.path.join(base, job["items"]),
+            "format": format_type,
+            "output": output
+        })
+    return resolved
+
+def read_item_list(path):
+    """Sorted unique item names from a list file, validated as they are read"""
+    with open(path, encoding='utf-8') as f:
+        chunks = iter(lambda: f.read(engine.CATALOG_READ_SIZE), "")
+        parser = engine.iter_json_item_list if path.lower().endswith('.json') else engine.iter_text_catalog
+        return sorted(set(parser(chunks, clean=engine.validate_item_names)))
+
+def run_job(job):
+    """Build one job's pack; returns its stats. Runs in a worker process"""
+    start = time.perf_counter()
+    items = read_item_list(job["items"])
+    if len(items) < 2:
+        raise ValueError("need at least 2 items to create transformation chain")
+    
+    recipes = 0
+    def progress(recipes_written, bytes_written):
+        nonlocal recipes
+        recipes = recipes_written
+    
+    os.makedirs(os.path.dirname(job["output"]) or ".", exist_ok=True)
+    temp_path = f"{job['output']}.{os.getpid()}.tmp"
+    size = engine.build_custom_pack(items, job["format"], temp_path, progress=progress)
+    os.replace(temp_path, job["output"])
+    return {"items": len(items), "recipes": recipes, "bytes": size, "seconds": time.perf_counter() - start}
+
+def init_worker():
+    """Jobs already use every core, so each job builds in its own worker without a nested pool"""
+    engine.PACK_BUILD_WORKERS = 1
+
+def report(job, stats, error):
+    """Print a job's outcome, with timing and throughput, as soon as it finishes"""
+    if error is not None:
+        print(f"{job['name']}: FAILED: {error}", file=sys.stderr, flush=True)
+        return
+    seconds = max(stats["seconds"], 1e-9)
+    print(f"{job['name']}: {stats['items']:,} items, {stats['recipes']:,} recipes, {stats['bytes']:,} bytes "
+          f"in {stats['seconds']:.2f}s ({stats['recipes'] / seconds:,.0f} recipes/s, "
+          f"{stats['bytes'] / seconds / 1e6:.2f} MB/s) -> {job['output']}", flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build transformation packs from a jobs manifest.")
+    parser.add_argument("manifest", help="JSON manifest of jobs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel jobs (default: all cores)")
+    parser.add_argument("--verbose", action="store_true", help="log engine progress")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Invalid manifest: {e}", file=sys.stderr)
+        return 2
+    
+    # Load the template and static assets once so forked workers inherit them
+    try:
+        engine.load_recipe_renderer()
+        engine.get_static_bundle()
+    except Exception as e:
+        print(f"Cannot load pack assets: {e}", file=sys.stderr)
+        return 2
+    
+    workers = max(1, min(args.workers, len(jobs)))
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        # A lone job keeps the engine's own pool, which splits large chains across cores
+        for job in jobs:
+            try:
+                results.append((job, run_job(job), None))
+            except Exception as e:
+                results.append((job, None, e))
+            report(*results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            futures = {pool.submit(run_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    results.append((job, future.result(), None))
+                except Exception as e:
+                    results.append((job, None, e))
+                report(*results[-1])
+    wall = time.perf_counter() - start
+    
+    built = [stats for _, stats, error in results if error is None]
+    recipes = sum(stats["recipes"] for stats in built)
+    size = sum(stats["bytes"] for stats in built)
+    print(f"Built {len(built)}/{len(jobs)} packs: {recipes:,} recipes, {size:,} bytes in {wall:.2f}s "
+          f"({recipes / max(wall, 1e-9):,.0f} recipes/s) with {workers} worker(s)")
+    return 0 if len(built) == len(jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1319 @@
+"""Pack generation engine: item cleaning and validation, recipe rendering, pack
+layouts and metadata, and ZIP assembly. Shared by the web app and the CLI, and
+never imports Flask. Jinja and the process pool machinery are imported on first
+use, so a plain import stays cheap for CLI runs and forked workers.
+"""
+import os, zipfile, re, logging, json, hashlib, zlib, threading, codecs
+from collections import namedtuple, OrderedDict
+import time, itertools, fnmatch
+from datetime import datetime
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Bundled assets live next to this module, so defaults work from any working directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Environment-based configuration
+TEMPLATE_PATH = os.getenv("TEMPLATE_PATH", os.path.join(BASE_DIR, "data", "recipe.json.j2"))
+PACK_ICON_PATH = os.getenv("PACK_ICON_PATH", os.path.join(BASE_DIR, "pack_icon.png"))
+TEXTURE_DIR = os.getenv("TEXTURE_DIR", os.path.join(BASE_DIR, "textures", "blocks"))
+FILTER_RULES_PATH = os.getenv("FILTER_RULES_PATH", os.path.join(BASE_DIR, "filter_rules.txt"))
+CATEGORY_RULES_PATH = os.getenv("CATEGORY_RULES_PATH", os.path.join(BASE_DIR, "category_rules.json"))
+DEBUG_TEMPLATES = os.getenv("DEBUG_TEMPLATES", "false").lower() == "true"
+PACK_BUILD_WORKERS = int(os.getenv("PACK_BUILD_WORKERS", str(os.cpu_count() or 1)))  # 1 disables the pool
+PACK_POOL_START_METHOD = os.getenv("PACK_POOL_START_METHOD", "forkserver")  # spawn where forkserver is unavailable
+PARALLEL_BUILD_THRESHOLD = int(os.getenv("PARALLEL_BUILD_THRESHOLD", "2000"))  # recipes
+PARALLEL_CHUNK_SIZE = int(os.getenv("PARALLEL_CHUNK_SIZE", "500"))  # recipes per pool task
+RECIPE_CACHE_MAX_ENTRIES = int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", "50000"))  # 0 disables the cache
+CATALOG_READ_SIZE = 256 * 1024  # characters decoded per parser step
+CATALOG_MAX_TOKEN = 1024 * 1024  # longest single JSON string or number accepted
+FILTER_RULES_CHECK_INTERVAL = 2.0  # seconds between rules file change checks
+CATEGORY_MEMO_MAX_ENTRIES = 200000  # memoized item categories per process before the memo is reset
+VALIDATED_ITEMS_MAX_ENTRIES = 200000  # remembered valid item names per process before the memo is reset
+
+# Static textures copied into complete packs (local path, path inside the archive)
+TEXTURE_FILES = [
+    (os.path.join(TEXTURE_DIR, 'transformation_table_front.png'), 'Transformation Table RP/textures/blocks/transformation_table_front.png'),
+    (os.path.join(TEXTURE_DIR, 'transformation_table_side.png'), 'Transformation Table RP/textures/blocks/transformation_table_side.png'),
+    (os.path.join(TEXTURE_DIR, 'transformation_table_top.png'), 'Transformation Table RP/textures/blocks/transformation_table_top.png')
+]
+
+# Pack formats the builder understands; custom sorts recipes into category folders
+PACK_FORMATS = ['standard', 'datapack', 'behavior_pack', 'complete_pack', 'custom']
+
+# Folder names allowed for custom pack categories
+CATEGORY_NAME_RE = re.compile(r'^[A-Za-z0-9_\-]+$')
+
+# Characters allowed in submitted item names
+ITEM_NAME_RE = re.compile(r'^[a-zA-Z0-9_\-\s]+$')
+
+# Valid Minecraft item id after cleaning
+ITEM_ID_RE = re.compile(r'^[a-z0-9_]+$')
+
+# JSON lexer for streamed catalogs: string, punctuation, bare literal, or a stray character
+JSON_TOKEN_RE = re.compile(r'\s*(?:("[^"\\]*(?:\\.[^"\\]*)*")|([{}\[\]:,])|([^\s{}\[\]:,"]+)|(\S))')
+JSON_LITERAL_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null')
+
+# Substitution points understood by the compiled recipe renderer
+RECIPE_PLACEHOLDER_RE = re.compile(r'\{\{\s*(input_item|result_item)\s*\}\}')
+
+# Crafting recipe for the transformation table block itself
+TRANSFORMATION_TABLE_RECIPE = """{
+    "format_version": "1.12",
+    "minecraft:recipe_shaped": {
+        "description": {
+            "identifier": "transformationtable:transformation_table"
+        },
+        "tags": [
+            "crafting_table"
+        ],
+        "pattern": [
+            "iDi",
+            "iCi",
+            "iii"
+        ],
+        "key": {
+            "i": {
+                "item": "minecraft:iron_ingot"
+            },
+            "D": {
+                "item": "minecraft:diamond"
+            },
+            "C": {
+                "item": "minecraft:crafting_table"
+            }
+        },
+        "result": {
+            "item": "transformationtable:transformation_table",
+            "count": 1
+        }
+    }
+}"""
+
+# Item filter compiled from FILTER_RULES_PATH: exact names in a set, every wildcard rule in one regex
+ItemFilter = namedtuple("ItemFilter", ["exact", "pattern", "rules"])
+item_filter = ItemFilter(frozenset(), None, 0)
+item_filter_stamp = None
+item_filter_checked = float("-inf")
+item_filter_lock = threading.Lock()
+
+# Custom pack folder classifier compiled from CATEGORY_RULES_PATH into an Aho-Corasick
+# automaton: per state its transitions, failure link and best (rank, category) match. folders
+# lists (name, keywords) per category in priority order, for describing the layout
+CategoryClassifier = namedtuple("CategoryClassifier", ["transitions", "failures", "matches", "default", "folders", "fingerprint", "memo"])
+category_classifier = None
+category_classifier_stamp = None
+category_classifier_checked = float("-inf")
+category_classifier_lock = threading.Lock()
+
+# Item names that already passed validate_item_names
+validated_items = set()
+
+# Compressed recipe entries keyed by (input_item, result_item, template hash), LRU ordered
+recipe_cache = OrderedDict()
+recipe_cache_lock = threading.Lock()
+recipe_cache_stats = {"hits": 0, "misses": 0}
+
+# Deflated archive member: CRC-32 and size of the original content plus the raw deflate stream
+CompressedEntry = namedtuple("CompressedEntry", ["crc", "file_size", "data"])
+
+# Static pack files, serialized and deflated once per process (see get_static_bundle)
+static_bundle = None
+static_bundle_lock = threading.Lock()
+
+# Pack builder process pool, created lazily per process (see get_process_pool)
+process_pool = None
+process_pool_pid = None
+process_pool_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def load_template_source():
+    """Load and cache the raw recipe template source"""
+    try:
+        with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+            content = f.read()
+            if DEBUG_TEMPLATES:
+                logger.info(f"Template loaded from: {TEMPLATE_PATH}")
+                logger.info(f"Template content preview: {content[:200]}...")
+            return content
+    except FileNotFoundError:
+        logger.error(f"Template file not found: {TEMPLATE_PATH}")
+        raise
+    except Exception as e:
+        logger.error(f"Error loading template: {e}")
+        raise
+
+@lru_cache(maxsize=1)
+def load_template():
+    """Load and cache the Jinja2 template"""
+    from jinja2 import Template
+    return Template(load_template_source())
+
+def compile_recipe_renderer(source):
+    """Compile a recipe template into a renderer that joins pre-split byte fragments.
+    
+    Only plain {{ input_item }} / {{ result_item }} substitutions are supported;
+    returns None for anything else so the caller can fall back to Jinja.
+    """
+    # Match Jinja's defaults: normalized newlines and a single trailing newline dropped
+    source = source.replace('\r\n', '\n').replace('\r', '\n')
+    if source.endswith('\n'):
+        source = source[:-1]
+    
+    parts = RECIPE_PLACEHOLDER_RE.split(source)
+    fragments = parts[0::2]
+    names = parts[1::2]
+    if any('{{' in fragment or '{%' in fragment or '{#' in fragment for fragment in fragments):
+        return None
+    
+    head = fragments[0].encode('utf-8')
+    slots = tuple((0 if name == 'input_item' else 1, fragment.encode('utf-8'))
+                  for name, fragment in zip(names, fragments[1:]))
+    
+    def render(input_item, result_item):
+        values = (input_item.encode('utf-8'), result_item.encode('utf-8'))
+        parts = [head]
+        for slot, fragment in slots:
+            parts.append(values[slot])
+            parts.append(fragment)
+        return b"".join(parts)
+    
+    return render
+
+@lru_cache(maxsize=1)
+def load_recipe_renderer():
+    """Load and cache the recipe renderer, preferring the compiled fast path over Jinja"""
+    source = load_template_source()
+    template = load_template()
+    
+    def render_with_jinja(input_item, result_item):
+        return template.render(input_item=input_item, result_item=result_item).encode('utf-8')
+    
+    renderer = compile_recipe_renderer(source)
+    if renderer is None:
+        logger.info("Recipe template uses unsupported syntax, rendering with Jinja")
+        return render_with_jinja
+    
+    # Never trust the fast path without checking it against Jinja once
+    probe = ("probe_input", "probe_result")
+    if renderer(*probe) != render_with_jinja(*probe):
+        logger.warning("Compiled recipe renderer disagrees with Jinja, rendering with Jinja")
+        return render_with_jinja
+    
+    if DEBUG_TEMPLATES:
+        logger.info("Using compiled recipe renderer")
+    return renderer
+
+@lru_cache(maxsize=1)
+def template_fingerprint():
+    """Hash of the cached template source, used in cache keys"""
+    return hashlib.sha256(load_template_source().encode('utf-8')).hexdigest()
+
+def static_asset_versions():
+    """Size and mtime of every static file copied into packs"""
+    versions = []
+    for path in [PACK_ICON_PATH] + [local_path for local_path, _ in TEXTURE_FILES]:
+        try:
+            st = os.stat(path)
+            versions.append([path, st.st_size, st.st_mtime_ns])
+        except OSError:
+            versions.append([path, None, None])
+    return versions
+
+def safe_filename(name):
+    """Create safe filename from item name"""
+    if not name or not isinstance(name, str):
+        raise ValueError("Invalid item name")
+    
+    # Remove dangerous characters and limit length
+    safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', name.strip())
+    if len(safe_name) > 50:
+        safe_name = safe_name[:50]
+    
+    if not safe_name:
+        raise ValueError("Item name results in empty filename")
+    
+    return safe_name
+
+def validate_item_names(items):
+    """Validate a list of item names"""
+    if not isinstance(items, list):
+        raise ValueError("Items must be a list")
+    
+    valid_items = []
+    for item in items:
+        if not isinstance(item, str):
+            continue
+        
+        item = item.strip()
+        if not item:
+            continue
+        
+        # Names seen before skip the length and character checks
+        if item in validated_items:
+            valid_items.append(item)
+            continue
+            
+        # Check for reasonable length and characters
+        if len(item) > 100:
+            raise ValueError(f"Item name too long: {item}")
+        
+        if not ITEM_NAME_RE.match(item):
+            raise ValueError(f"Invalid characters in item name: {item}")
+        
+        if len(validated_items) >= VALIDATED_ITEMS_MAX_ENTRIES:
+            validated_items.clear()
+        validated_items.add(item)
+        valid_items.append(item)
+    
+    return valid_items
+
+def file_stamp(path):
+    """Identity of a config file's current contents for change detection, or None if missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+def compile_filter_rules(lines):
+    """Compile filter rule lines into an ItemFilter; rules with * ? or [ are globs, the rest exact names"""
+    exact = set()
+    patterns = []
+    for line in lines:
+        rule = line.split('#', 1)[0].strip().lower()
+        if not rule:
+            continue
+        if any(char in rule for char in '*?['):
+            patterns.append(fnmatch.translate(rule))
+        else:
+            exact.add(rule)
+    
+    pattern = re.compile('|'.join(patterns)) if patterns else None
+    return ItemFilter(frozenset(exact), pattern, len(exact) + len(patterns))
+
+def get_item_filter():
+    """Return the compiled item filter, recompiling it when the rules file changes"""
+    global item_filter, item_filter_stamp, item_filter_checked
+    now = time.monotonic()
+    if now - item_filter_checked < FILTER_RULES_CHECK_INTERVAL:
+        return item_filter
+    
+    with item_filter_lock:
+        if now - item_filter_checked < FILTER_RULES_CHECK_INTERVAL:
+            return item_filter
+        
+        stamp = file_stamp(FILTER_RULES_PATH)
+        if stamp != item_filter_stamp:
+            if stamp is None:
+                logger.warning(f"Filter rules not found at {FILTER_RULES_PATH}, no items will be filtered")
+                item_filter = ItemFilter(frozenset(), None, 0)
+            else:
+                try:
+                    with open(FILTER_RULES_PATH, 'r', encoding='utf-8') as f:
+                        item_filter = compile_filter_rules(f)
+                    logger.info(f"Loaded {item_filter.rules} filter rules from {FILTER_RULES_PATH}")
+                except (IOError, re.error) as e:
+                    # Keep filtering with the previous rules rather than none
+                    logger.error(f"Could not load filter rules: {e}")
+            item_filter_stamp = stamp
+        
+        item_filter_checked = now
+        return item_filter
+
+def clean_item_name(item_string):
+    """Clean item name by removing minecraft: prefix and other formatting"""
+    cleaned = clean_item_names([item_string])
+    return cleaned[0] if cleaned else None
+
+def clean_item_names(item_strings):
+    """Clean and filter a batch of raw item strings in one pass, dropping rejected ones"""
+    exact, pattern, _ = get_item_filter()
+    cleaned = []
+    filtered = 0
+    
+    for item_string in item_strings:
+        if not item_string or not isinstance(item_string, str):
+            continue
+        
+        # Remove quotes
+        item_string = item_string.strip('"\'')
+        
+        # Remove minecraft: prefix
+        if item_string.startswith('minecraft:'):
+            item_string = item_string[10:]  # Remove 'minecraft:' (10 characters)
+        
+        # Remove any trailing data after : (like damage values)
+        if ':' in item_string:
+            item_string = item_string.split(':')[0]
+        
+        # Remove any whitespace
+        item_string = item_string.strip()
+        
+        # Filter out problematic items
+        lower_name = item_string.lower()
+        if lower_name in exact or (pattern and pattern.match(lower_name)):
+            filtered += 1
+            continue
+        
+        # Validate item name (only allow valid Minecraft item characters)
+        if ITEM_ID_RE.match(item_string):
+            cleaned.append(item_string)
+    
+    if filtered:
+        logger.debug(f"Filtered out {filtered} problematic item(s)")
+    return cleaned
+
+def iter_json_catalog(chunks, clean=clean_item_names):
+    """Scan JSON text chunks incrementally, yielding items from every "items" array.
+    
+    clean maps each chunk's raw strings to the items to yield and may raise ValueError.
+    """
+    # One frame per open container: [is_object, collecting, skipping]. Like the recursive
+    # parser, strings directly inside an "items" array are collected and anything nested
+    # deeper inside that array is skipped
+    stack = []
+    expect = "value"  # value, value_or_end, key, key_or_end, colon, comma_or_end, eof
+    key = None
+    buffer = ""
+    found = []
+    
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            buffer += chunk
+        
+        pos = len(buffer)
+        for match in JSON_TOKEN_RE.finditer(buffer):
+            string, punct, literal, stray = match.groups()
+            
+            # A token cut off by the chunk boundary is finished by the next chunk
+            if not final and (stray == '"' or (literal and match.end() == len(buffer))):
+                pos = match.start()
+                break
+            if stray:
+                raise ValueError(f"Unexpected character {stray!r}")
+            
+            if expect == "colon":
+                if punct != ':':
+                    raise ValueError("Expected ':'")
+                expect = "value"
+                continue
+            
+            if expect in ("key", "key_or_end") and string:
+                key = json.loads(string) if '\\' in string else string[1:-1]
+                expect = "colon"
+                continue
+            
+            if punct == ',' and expect == "comma_or_end":
+                expect = "key" if stack[-1][0] else "value"
+                continue
+            
+            if punct in ('}', ']'):
+                closes_object = punct == '}'
+                if not stack or stack[-1][0] != closes_object or expect not in ("comma_or_end", "key_or_end" if closes_object else "value_or_end"):
+                    raise ValueError(f"Unexpected {punct!r}")
+                stack.pop()
+                expect = "comma_or_end" if stack else "eof"
+                continue
+            
+            if expect not in ("value", "value_or_end"):
+                raise ValueError(f"Unexpected token {match.group().strip()[:20]!r}")
+            
+            parent = stack[-1] if stack else None
+            if punct in ('{', '['):
+                skipping = bool(parent) and (parent[1] or parent[2])
+                collecting = punct == '[' and bool(parent) and parent[0] and key == "items" and not skipping
+                stack.append([punct == '{', collecting, skipping])
+                expect = "key_or_end" if punct == '{' else "value_or_end"
+                continue
+            
+            if string:
+                if parent and parent[1]:
+                    found.append(json.loads(string) if '\\' in string else string[1:-1])
+            elif not literal or not JSON_LITERAL_RE.fullmatch(literal):
+                raise ValueError(f"Unexpected token {match.group().strip()[:20]!r}")
+            expect = "comma_or_end" if stack else "eof"
+        
+        buffer = buffer[pos:]
+        if len(buffer) > CATALOG_MAX_TOKEN:
+            raise ValueError("JSON token too long")
+        
+        yield from clean(found)
+        found.clear()
+    
+    if expect != "eof":
+        raise ValueError("Unexpected end of JSON")
+
+def iter_ndjson_items(chunks, clean=validate_item_names):
+    """Scan NDJSON text chunks holding one JSON string per line, yielding items as lines complete"""
+    buffer = ""
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            lines, buffer = [buffer], ""
+        else:
+            lines = (buffer + chunk).split('\n')
+            buffer = lines.pop()
+            if len(buffer) > CATALOG_MAX_TOKEN:
+                raise ValueError("Line too long")
+        
+        names = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            name = json.loads(line)
+            if not isinstance(name, str):
+                raise ValueError("Each NDJSON line must be a JSON string")
+            names.append(name)
+        yield from clean(names)
+
+def iter_json_item_list(chunks, clean=clean_item_names):
+    """Like iter_json_catalog, but a bare top-level array is read as if it were {"items": [...]}"""
+    chunks = iter(chunks)
+    head = []
+    for chunk in chunks:
+        head.append(chunk)
+        if chunk.strip():
+            break
+    chunks = itertools.chain(head, chunks)
+    if "".join(head).lstrip().startswith('['):
+        chunks = itertools.chain(['{"items": '], chunks, ['}'])
+    return iter_json_catalog(chunks, clean=clean)
+
+def iter_text_catalog(chunks, clean=clean_item_names):
+    """Scan text chunks line by line, yielding items; clean maps each chunk's lines as in iter_json_catalog"""
+    buffer = ""
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            lines, buffer = [buffer], ""
+        else:
+            lines = (buffer + chunk).split('\n')
+            buffer = lines.pop()
+            if len(buffer) > CATALOG_MAX_TOKEN:
+                raise ValueError("Line too long")
+        
+        lines = [line.strip() for line in lines]
+        yield from clean([line for line in lines if line and not line.startswith('#') and not line.startswith('//')])
+
+def iter_decoded_file(stream, check=None):
+    """Read a binary stream as UTF-8 text chunks without loading it whole.
+    
+    check, if given, is called with the bytes received so far after every read
+    and may raise to stop the stream.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    received = 0
+    for data in iter(lambda: stream.read(CATALOG_READ_SIZE), b''):
+        received += len(data)
+        if check:
+            check(received)
+        yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+def read_catalog_file(stream, filename):
+    """Stream a catalog through the parser for its extension; returns (unique items, total found) or None if unsupported"""
+    lower_name = filename.lower()
+    if lower_name.endswith('.json'):
+        parser = iter_json_catalog
+    elif lower_name.endswith('.txt'):
+        parser = iter_text_catalog
+    else:
+        return None
+    
+    items = set()
+    total = 0
+    try:
+        for item in parser(iter_decoded_file(stream)):
+            items.add(item)
+            total += 1
+    except UnicodeDecodeError:
+        # Not a syntax problem; reported as a processing error like before
+        raise
+    except ValueError as e:
+        # A malformed document contributes nothing rather than failing the whole upload
+        logger.error(f"Invalid JSON format in {filename}: {e}")
+        return set(), 0
+    
+    return items, total
+
+def parse_catalog_path(filename, path):
+    """Parse one catalog file from disk; returns (filename, error, unique items, total found, seconds)"""
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb') as stream:
+            result = read_catalog_file(stream, filename)
+    except Exception as e:
+        logger.error(f"Error processing file {filename}: {e}")
+        return filename, "processing error", set(), 0, time.perf_counter() - start
+    
+    if result is None:
+        return filename, "unsupported format", set(), 0, time.perf_counter() - start
+    file_items, file_total = result
+    if not file_total:
+        return filename, "no valid items found", set(), 0, time.perf_counter() - start
+    return filename, None, file_items, file_total, time.perf_counter() - start
+
+def build_custom_pack(selected_items, format_type, zip_path, progress=None):
+    """Build a custom pack into zip_path and return its size, removing partial output on failure"""
+    try:
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            write_custom_pack(zipf, selected_items, format_type, progress=progress)
+    except Exception:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        raise
+    
+    zip_size = os.path.getsize(zip_path)
+    if zip_size == 0:
+        os.remove(zip_path)
+        raise ValueError("Custom ZIP creation failed or empty")
+    return zip_size
+
+def resolve_pack_format(format_type, layout="flat"):
+    """Map a public format and layout (flat or categories) to the format the builder uses.
+    
+    Raises ValueError when the combination is not supported.
+    """
+    if format_type not in PACK_FORMATS or format_type == 'custom':
+        raise ValueError("format must be one of standard, datapack, behavior_pack, complete_pack")
+    if layout not in ('flat', 'categories'):
+        raise ValueError("layout must be flat or categories")
+    if layout == 'categories':
+        if format_type != 'standard':
+            raise ValueError("layout=categories is only available for the standard format")
+        return 'custom'
+    return format_type
+
+def recipe_arcname(format_type, filename, input_item):
+    """Path of a recipe file inside the archive for the given format"""
+    if format_type == 'datapack':
+        return f"data/transformation/recipes/{filename}"
+    elif format_type == 'behavior_pack':
+        return f"Transformation Table BP/recipes/{filename}"
+    elif format_type == 'complete_pack':
+        return f"Transformation Table BP/recipes/{filename}"
+    elif format_type == 'custom':
+        category = get_item_category(input_item)
+        return f"{category}/{filename}"
+    else:
+        return filename
+
+def recipe_pairs(selected_items):
+    """Consecutive (input, result) pairs of the sorted chain plus the cycle-back pair"""
+    pairs = [(selected_items[i], selected_items[i + 1]) for i in range(len(selected_items) - 1)]
+    
+    # Add the cycle-back recipe (last item → first item)
+    if len(selected_items) >= 2:
+        pairs.append((selected_items[-1], selected_items[0]))
+    return pairs
+
+def build_recipe_chunk(pairs, format_type):
+    """Render and deflate a slice of the chain, returning (arcname, entry) or None per pair.
+    
+    Runs in pack builder pool workers as well as inline for small batches.
+    """
+    # Load cached recipe renderer
+    render_recipe = load_recipe_renderer()
+    
+    results = []
+    for input_item, result_item in pairs:
+        try:
+            arcname = recipe_entry_name(format_type, input_item, result_item)
+            rendered = render_recipe(input_item, result_item)
+            results.append((arcname, compress_entry(rendered)))
+        except Exception as e:
+            logger.error(f"Error processing item {input_item} → {result_item}: {e}")
+            results.append(None)
+    return results
+
+def get_process_pool():
+    """Return this process's worker pool for pack builds and catalog parsing, creating it on first use"""
+    global process_pool, process_pool_pid
+    with process_pool_lock:
+        # A pool inherited through fork belongs to the parent, never reuse it
+        if process_pool is None or process_pool_pid != os.getpid():
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+            # Never fork the caller: a web worker's other threads may hold engine locks at that
+            # moment. Workers start from a clean forkserver that has imported only this module
+            method = PACK_POOL_START_METHOD if PACK_POOL_START_METHOD in multiprocessing.get_all_start_methods() else "spawn"
+            context = multiprocessing.get_context(method)
+            if method == "forkserver":
+                context.set_forkserver_preload(["engine"])
+            process_pool = ProcessPoolExecutor(max_workers=PACK_BUILD_WORKERS, mp_context=context)
+            process_pool_pid = os.getpid()
+            logger.info(f"Started pack builder pool with {PACK_BUILD_WORKERS} {method} workers")
+        return process_pool
+
+def recipe_entry_name(format_type, input_item, result_item):
+    """Archive path of the recipe for one pair"""
+    safe_input = safe_filename(input_item)
+    safe_result = safe_filename(result_item)
+    filename = f"{safe_input}_to_{safe_result}.json"
+    return recipe_arcname(format_type, filename, input_item)
+
+def recipe_cache_get_many(keys):
+    """Look up compressed recipe entries, returning the entry or None per key"""
+    entries = []
+    with recipe_cache_lock:
+        for key in keys:
+            entry = recipe_cache.get(key)
+            if entry is not None:
+                recipe_cache.move_to_end(key)
+            entries.append(entry)
+    hits = sum(1 for entry in entries if entry is not None)
+    recipe_cache_stats["hits"] += hits
+    recipe_cache_stats["misses"] += len(entries) - hits
+    return entries
+
+def recipe_cache_put(key, entry):
+    """Remember a compressed recipe entry, evicting the least recently used beyond the bound"""
+    if RECIPE_CACHE_MAX_ENTRIES <= 0:
+        return
+    with recipe_cache_lock:
+        recipe_cache[key] = entry
+        recipe_cache.move_to_end(key)
+        while len(recipe_cache) > RECIPE_CACHE_MAX_ENTRIES:
+            recipe_cache.popitem(last=False)
+
+def iter_compressed_recipes(pairs, format_type):
+    """Yield (arcname, entry) or None per pair in chain order, reusing cached entries.
+    
+    Only pairs missing from the recipe cache are rendered, so a small change to a
+    long chain costs a handful of recipes instead of the whole chain.
+    """
+    template_hash = template_fingerprint()
+    keys = [(input_item, result_item, template_hash) for input_item, result_item in pairs]
+    cached = recipe_cache_get_many(keys) if RECIPE_CACHE_MAX_ENTRIES > 0 else [None] * len(keys)
+    
+    missing = [pair for pair, entry in zip(pairs, cached) if entry is None]
+    if len(pairs) > 500:
+        logger.info(f"Recipe cache: {len(pairs) - len(missing)} reused, {len(missing)} to build")
+    built = iter_built_recipes(missing, format_type)
+    
+    for pair, key, entry in zip(pairs, keys, cached):
+        if entry is None:
+            result = next(built)
+            if result is not None:
+                recipe_cache_put(key, result[1])
+            yield result
+            continue
+        
+        try:
+            yield recipe_entry_name(format_type, *pair), entry
+        except ValueError as e:
+            logger.error(f"Error processing item {pair[0]} → {pair[1]}: {e}")
+            yield None
+
+def iter_built_recipes(pairs, format_type):
+    """Yield (arcname, entry) or None per pair in chain order, using the process pool for large batches"""
+    if PACK_BUILD_WORKERS > 1 and len(pairs) >= PARALLEL_BUILD_THRESHOLD:
+        chunks = [pairs[i:i + PARALLEL_CHUNK_SIZE] for i in range(0, len(pairs), PARALLEL_CHUNK_SIZE)]
+        try:
+            pool = get_process_pool()
+            futures = [pool.submit(build_recipe_chunk, chunk, format_type) for chunk in chunks]
+        except Exception as e:
+            logger.warning(f"Pack builder pool unavailable, building serially: {e}")
+            futures = None
+        
+        if futures:
+            logger.info(f"Building {len(pairs)} recipes in {len(chunks)} chunks across {PACK_BUILD_WORKERS} workers")
+            # Results are gathered in submission order so output matches the serial path
+            for chunk, future in zip(chunks, futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.warning(f"Pack builder chunk failed, rebuilding it serially: {e}")
+                    results = build_recipe_chunk(chunk, format_type)
+                yield from results
+            return
+    
+    for pair in pairs:
+        yield from build_recipe_chunk([pair], format_type)
+
+def iter_recipe_entries(selected_items, format_type):
+    """Yield (arcname, entry) for every recipe in a custom download, in archive order"""
+    # Generate recipe files - SEQUENTIAL TRANSFORMATION
+    pairs = recipe_pairs(selected_items)
+    successful_recipes = 0
+    failed_recipes = 0
+    
+    for i, result in enumerate(iter_compressed_recipes(pairs, format_type)):
+        if result is None:
+            failed_recipes += 1
+            continue
+        
+        yield result
+        successful_recipes += 1
+        
+        # Log progress for large batches
+        if len(selected_items) > 500 and (i + 1) % 100 == 0:
+            logger.info(f"Progress: {i + 1}/{len(pairs)} recipes generated")
+    
+    logger.info(f"Recipe generation complete: {successful_recipes} successful, {failed_recipes} failed")
+    
+    # ALWAYS add the transformation table crafting recipe for behavior packs and complete packs
+    if format_type in ['behavior_pack', 'complete_pack']:
+        yield "Transformation Table BP/recipes/transformation_table.json", get_static_bundle()["table_recipe"]
+        logger.info("Added transformation table crafting recipe to pack")
+
+def write_pack_metadata(zipf, selected_items, format_type, date_time=None):
+    """Add metadata files based on format"""
+    try:
+        if format_type == 'custom':
+            add_custom_metadata(zipf, selected_items, date_time)
+        else:
+            # Static files are copied in pre-compressed from the asset bundle
+            for arcname, entry in get_static_bundle()["packs"].get(format_type, ()):
+                zip_write_raw(zipf, arcname, entry, date_time)
+    except Exception as e:
+        logger.error(f"Error adding metadata: {e}")
+
+def write_custom_pack(zipf, selected_items, format_type, date_time=None, progress=None):
+    """Write the recipe chain and format metadata for a custom download into zipf.
+    
+    progress, if given, is called with (recipes_written, bytes_written) after each recipe.
+    """
+    # One timestamp for every entry keeps serial and parallel builds byte-identical
+    date_time = date_time or time.localtime(time.time())[:6]
+    for count, (arcname, entry) in enumerate(iter_recipe_entries(selected_items, format_type), 1):
+        zip_write_raw(zipf, arcname, entry, date_time)
+        if progress:
+            progress(count, zipf.fp.tell())
+    write_pack_metadata(zipf, selected_items, format_type, date_time)
+
+def compile_category_rules(config, fingerprint=""):
+    """Compile {"default", "categories": [{"name", "priority", "keywords"}]} into a CategoryClassifier.
+    
+    Higher priority wins when keywords of several categories occur in one item;
+    equal priorities fall back to file order.
+    """
+    default = config.get("default", "misc")
+    if not isinstance(default, str) or not CATEGORY_NAME_RE.match(default):
+        raise ValueError(f"Invalid default category: {default!r}")
+    
+    categories = []
+    for position, rule in enumerate(config.get("categories", [])):
+        name = rule.get("name") if isinstance(rule, dict) else None
+        keywords = rule.get("keywords") if isinstance(rule, dict) else None
+        if not isinstance(name, str) or not CATEGORY_NAME_RE.match(name) or not isinstance(keywords, list):
+            logger.warning(f"Skipping invalid category rule #{position + 1}")
+            continue
+        categories.append((-int(rule.get("priority", 0)), position, name, keywords))
+    categories.sort()
+    
+    # Trie of every keyword; rank 0 is the highest priority category
+    transitions = [{}]
+    matches = [None]
+    for rank, (_, _, name, keywords) in enumerate(categories):
+        for keyword in keywords:
+            if not isinstance(keyword, str) or not keyword:
+                continue
+            state = 0
+            for char in keyword.lower():
+                next_state = transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(transitions)
+                    transitions[state][char] = next_state
+                    transitions.append({})
+                    matches.append(None)
+                state = next_state
+            if matches[state] is None or rank < matches[state][0]:
+                matches[state] = (rank, name)
+    
+    # Failure links breadth first, folding each state's best match down its failure chain
+    failures = [0] * len(transitions)
+    queue = list(transitions[0].values())
+    for state in queue:
+        for char, next_state in transitions[state].items():
+            failure = failures[state]
+            while failure and char not in transitions[failure]:
+                failure = failures[failure]
+            failure = transitions[failure].get(char, 0)
+            failures[next_state] = failure if failure != next_state else 0
+            inherited = matches[failures[next_state]]
+            if inherited is not None and (matches[next_state] is None or inherited[0] < matches[next_state][0]):
+                matches[next_state] = inherited
+            queue.append(next_state)
+    
+    folders = OrderedDict()
+    for _, _, name, keywords in categories:
+        folders.setdefault(name, []).extend(keyword for keyword in keywords if isinstance(keyword, str) and keyword)
+    folders.pop(default, None)
+    
+    return CategoryClassifier(transitions, failures, matches, default, list(folders.items()), fingerprint, {})
+
+def get_category_classifier():
+    """Return the compiled category classifier, recompiling it when the rules file changes"""
+    global category_classifier, category_classifier_stamp, category_classifier_checked
+    now = time.monotonic()
+    if category_classifier is not None and now - category_classifier_checked < FILTER_RULES_CHECK_INTERVAL:
+        return category_classifier
+    
+    with category_classifier_lock:
+        if category_classifier is not None and now - category_classifier_checked < FILTER_RULES_CHECK_INTERVAL:
+            return category_classifier
+        
+        stamp = file_stamp(CATEGORY_RULES_PATH)
+        if stamp != category_classifier_stamp or category_classifier is None:
+            try:
+                with open(CATEGORY_RULES_PATH, 'rb') as f:
+                    content = f.read()
+                category_classifier = compile_category_rules(json.loads(content), hashlib.sha256(content).hexdigest())
+                logger.info(f"Loaded category rules from {CATEGORY_RULES_PATH}: {len(category_classifier.transitions)} matcher states")
+            except FileNotFoundError:
+                logger.warning(f"Category rules not found at {CATEGORY_RULES_PATH}, all custom items go to misc")
+                category_classifier = compile_category_rules({})
+            except (IOError, ValueError, TypeError, AttributeError) as e:
+                # Keep classifying with the previous rules rather than none
+                logger.error(f"Could not load category rules: {e}")
+                if category_classifier is None:
+                    category_classifier = compile_category_rules({})
+            category_classifier_stamp = stamp
+        
+        category_classifier_checked = now
+        return category_classifier
+
+def get_item_category(item):
+    """Categorize items for custom folder structure"""
+    classifier = get_category_classifier()
+    if not item:
+        return classifier.default
+    
+    memo = classifier.memo
+    category = memo.get(item)
+    if category is not None:
+        return category
+    
+    # One pass over the name finds every keyword; the best ranked one wins
+    transitions, failures, matches = classifier.transitions, classifier.failures, classifier.matches
+    state = 0
+    best = None
+    for char in item.lower():
+        while state and char not in transitions[state]:
+            state = failures[state]
+        state = transitions[state].get(char, 0)
+        match = matches[state]
+        if match is not None and (best is None or match[0] < best[0]):
+            best = match
+            if best[0] == 0:
+                break
+    
+    category = best[1] if best else classifier.default
+    if len(memo) >= CATEGORY_MEMO_MAX_ENTRIES:
+        memo.clear()
+    memo[item] = category
+    return category
+
+def datapack_assets():
+    """Build pack.mcmeta for Java datapack as (arcname, content) pairs"""
+    pack_mcmeta = {
+        "pack": {
+            "pack_format": 10,
+            "description": "Transformation Recipes Datapack"
+        }
+    }
+    return [("pack.mcmeta", json.dumps(pack_mcmeta, indent=2))]
+
+def behavior_pack_assets():
+    """Build manifest.json and pack structure for Bedrock behavior pack as (arcname, content) pairs"""
+    assets = []
+    
+    # FIXED: Using the exact same UUIDs as your working uncrafting table pack
+    manifest = {
+        "format_version": 2,
+        "metadata": {
+            "authors": ["foamwrap"]
+        },
+        "header": {
+            "name": "Transformation Table",
+            "description": "By foamwrap",
+            "min_engine_version": [1, 20, 60],
+            "uuid": "b6f04080-1c3d-4bc0-b8f2-4624078d108f",  # Same as uncrafting table structure
+            "version": [3, 0, 0]
+        },
+        "modules": [
+            {
+                "type": "data",
+                "uuid": "56df8307-2bf9-4a4e-a7d6-fe057ed5a075",  # Same as uncrafting table structure
+                "version": [3, 0, 0]
+            }
+        ],
+        "dependencies": [
+            {
+                "uuid": "54ac9ad2-a9c7-4596-bacb-73336ba88451",  # Same as uncrafting table structure
+                "version": [3, 0, 0]
+            }
+        ]
+    }
+    assets.append(("Transformation Table BP/manifest.json", json.dumps(manifest, indent=4)))
+    
+    # FIXED: Block definition matching your working uncrafting table exactly
+    transformation_table_block = {
+        "format_version": "1.20.60",
+        "minecraft:block": {
+            "description": {
+                "identifier": "transformationtable:transformation_table",
+                "menu_category": {
+                    "category": "equipment"
+                },
+                "is_experimental": False,
+                "traits": {
+                    "minecraft:placement_direction": {
+                        "enabled_states": ["minecraft:cardinal_direction"]
+                    }
+                }
+            },
+            "components": {
+                "minecraft:crafting_table": {
+                    "crafting_tags": ["transformation_table"],  # Fixed to match identifier
+                    "grid_size": 3,
+                    "table_name": "Transformation"
+                },
+                "minecraft:collision_box": {
+                    "size": [16, 16, 16],
+                    "origin": [-8, 0, -8]
+                },
+                "minecraft:geometry": "geometry.transformation_table",
+                "minecraft:material_instances": {
+                    "up": {
+                        "texture": "tt_top",
+                        "render_method": "opaque"
+                    },
+                    "*": {
+                        "texture": "tt_side",
+                        "render_method": "opaque"
+                    },
+                    "north": {
+                        "texture": "tt_front",
+                        "render_method": "opaque"
+                    }
+                },
+                "minecraft:flammable": True,  # Fixed: should be boolean, not string
+                "minecraft:destructible_by_mining": {
+                    "seconds_to_destroy": 1
+                },
+                "minecraft:destructible_by_explosion": {
+                    "explosion_resistance": 7.5
+                },
+                "minecraft:selection_box": {
+                    "origin": [-8, 0, -8],
+                    "size": [16, 16, 16]
+                }
+            },
+            "permutations": [
+                {
+                    "condition": "query.block_state('minecraft:cardinal_direction')=='south'",
+                    "components": {
+                        "minecraft:transformation": {
+                            "rotation": [0, 0, 0]
+                        }
+                    }
+                },
+                {
+                    "condition": "query.block_state('minecraft:cardinal_direction')=='east'",
+                    "components": {
+                        "minecraft:transformation": {
+                            "rotation": [0, 90, 0]
+                        }
+                    }
+                },
+                {
+                    "condition": "query.block_state('minecraft:cardinal_direction')=='west'",
+                    "components": {
+                        "minecraft:transformation": {
+                            "rotation": [0, -90, 0]
+                        }
+                    }
+                },
+                {
+                    "condition": "query.block_state('minecraft:cardinal_direction')=='north'",
+                    "components": {
+                        "minecraft:transformation": {
+                            "rotation": [0, 180, 0]
+                        }
+                    }
+                }
+            ]
+        }
+    }
+    assets.append(("Transformation Table BP/blocks/transformation_table.json",
+                   json.dumps(transformation_table_block, indent=2)))
+    
+    # Copy pack icon
+    try:
+        if os.path.exists(PACK_ICON_PATH):
+            with open(PACK_ICON_PATH, 'rb') as icon_file:
+                pack_icon_content = icon_file.read()
+            assets.append(("Transformation Table BP/pack_icon.png", pack_icon_content))
+            logger.info(f"Added pack icon from {PACK_ICON_PATH} (size: {len(pack_icon_content)} bytes)")
+        else:
+            logger.warning(f"Pack icon not found at {PACK_ICON_PATH}")
+    except Exception as e:
+        logger.error(f"Error adding pack icon: {e}")
+    
+    return assets
+
+def complete_pack_assets():
+    """Build both Behavior Pack and Resource Pack files as (arcname, content) pairs"""
+    # First add the Behavior Pack components
+    assets = behavior_pack_assets()
+    
+    try:
+        # RP Manifest
+        rp_manifest = {
+            "format_version": 2,
+            "metadata": {"authors": ["foamwrap"]},
+            "header": {
+                "name": "Transformation Table",
+                "description": "By foamwrap",
+                "min_engine_version": [1, 20, 60],
+                "uuid": "54ac9ad2-a9c7-4596-bacb-73336ba88451",
+                "version": [3, 0, 0]
+            },
+            "modules": [
+                {
+                    "type": "resources",
+                    "uuid": "d1e248e1-bcd8-4bfe-b632-650602f94f32",
+                    "version": [3, 0, 0]
+                }
+            ],
+            "dependencies": [
+                {
+                    "uuid": "b6f04080-1c3d-4bc0-b8f2-4624078d108f",
+                    "version": [3, 0, 0]
+                }
+            ]
+        }
+        assets.append(("Transformation Table RP/manifest.json", json.dumps(rp_manifest, indent=4)))
+    except Exception as e:
+        logger.error(f"Error adding RP manifest: {e}")
+        raise
+    
+    try:
+        # FIXED: RP blocks.json with correct namespace to match your working example
+        rp_blocks = {
+            "format_version": [1, 1, 0],
+            "transformationtable:transformation_table": {  # FIXED: Match the block identifier
+                "sound": "wood",
+                "textures": {
+                    "up": "tt_top",
+                    "side": "tt_side"
+                }
+            }
+        }
+        assets.append(("Transformation Table RP/blocks.json", json.dumps(rp_blocks, indent=4)))
+    except Exception as e:
+        logger.error(f"Error adding RP blocks.json: {e}")
+        raise
+    
+    try:
+        # Language files
+        assets.append(("Transformation Table RP/texts/languages.json", '[\n\t"en_US"\n]'))
+        assets.append(("Transformation Table RP/texts/en_US.lang",
+                       "tile.transformationtable:transformation_table.name=Transformation Table"))
+    except Exception as e:
+        logger.error(f"Error adding language files: {e}")
+        raise
+    
+    try:
+        # Terrain texture
+        terrain_texture = {
+            "num_mip_levels": 4,
+            "padding": 8,
+            "resource_pack_name": "Transformation Table",
+            "texture_name": "atlas.terrain",
+            "texture_data": {
+                "tt_side": {
+                    "textures": "textures/blocks/transformation_table_side"
+                },
+                "tt_top": {
+                    "textures": "textures/blocks/transformation_table_top"
+                },
+                "tt_front": {
+                    "textures": "textures/blocks/transformation_table_front"
+                }
+            }
+        }
+        assets.append(("Transformation Table RP/textures/terrain_texture.json",
+                       json.dumps(terrain_texture, indent=4)))
+    except Exception as e:
+        logger.error(f"Error adding terrain texture: {e}")
+        raise
+    
+    try:
+        # Geometry
+        geometry = {
+            "format_version": "1.12.0",
+            "minecraft:geometry": [
+                {
+                    "description": {
+                        "identifier": "geometry.transformation_table",
+                        "texture_width": 16,
+                        "texture_height": 16,
+                        "visible_bounds_width": 2,
+                        "visible_bounds_height": 2.5,
+                        "visible_bounds_offset": [0, 0.75, 0]
+                    },
+                    "bones": [
+                        {
+                            "name": "root",
+                            "pivot": [0, 0, 0],
+                            "cubes": [
+                                {
+                                    "origin": [-8, 0, -8],
+                                    "size": [16, 16, 16],
+                                    "uv": {
+                                        "north": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "north"},
+                                        "east": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "east"},
+                                        "south": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "south"},
+                                        "west": {"uv": [0, 0], "uv_size": [16, 16], "material_instance": "west"},
+                                        "up": {"uv": [16, 16], "uv_size": [-16, -16], "material_instance": "up"},
+                                        "down": {"uv": [16, 16], "uv_size": [-16, -16], "material_instance": "down"}
+                                    }
+                                }
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
+        assets.append(("Transformation Table RP/models/blocks/transformation_table.geo.json",
+                       json.dumps(geometry, indent=4)))
+    except Exception as e:
+        logger.error(f"Error adding geometry: {e}")
+        raise
+    
+    try:
+        # Copy pack icon to RP as well
+        if os.path.exists(PACK_ICON_PATH):
+            with open(PACK_ICON_PATH, 'rb') as icon_file:
+                pack_icon_content = icon_file.read()
+            assets.append(("Transformation Table RP/pack_icon.png", pack_icon_content))
+        else:
+            logger.warning(f"Pack icon not found at {PACK_ICON_PATH}")
+    except Exception as e:
+        logger.error(f"Error adding RP pack icon: {e}")
+        # Don't raise, continue without icon
+    
+    # Add real texture files with detailed logging
+    for local_path, zip_path in TEXTURE_FILES:
+        try:
+            if os.path.exists(local_path):
+                with open(local_path, 'rb') as texture_file:
+                    texture_content = texture_file.read()
+                assets.append((zip_path, texture_content))
+                logger.info(f"Added real texture: {local_path} -> {zip_path} ({len(texture_content)} bytes)")
+            else:
+                # Fall back to placeholder if texture file doesn't exist
+                assets.append((zip_path, create_placeholder_texture()))
+                logger.warning(f"Texture not found at {local_path}, using placeholder")
+        except Exception as e:
+            logger.error(f"Error processing texture {local_path}: {e}")
+            # Add placeholder on error
+            assets.append((zip_path, create_placeholder_texture()))
+    
+    return assets
+
+def create_placeholder_texture():
+    """Create a simple placeholder texture for the block faces"""
+    # Minimal 16x16 PNG file (transparent placeholder)
+    return b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x10\x00\x00\x00\x10\x08\x06\x00\x00\x00\x1f\xf3\xffa\x00\x00\x00\x1dIDATx\x9cc\xf8\x0f\x00\x01\x01\x01\x00\x18\xdd\x8d\xb4\x1c\x00\x00\x00\x00IEND\xaeB`\x82'
+
+def compress_entry(content):
+    """Deflate content exactly as zipfile.ZIP_DEFLATED would"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    data = compressor.compress(content) + compressor.flush()
+    return CompressedEntry(zlib.crc32(content), len(content), data)
+
+def zip_write_raw(zipf, arcname, entry, date_time=None):
+    """Copy an already compressed entry into an open ZipFile without recompressing it"""
+    zinfo = zipfile.ZipInfo(filename=arcname,
+                            date_time=date_time or time.localtime(time.time())[:6])
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.external_attr = 0o600 << 16     # ?rw-------
+    zinfo.CRC = entry.crc
+    zinfo.file_size = entry.file_size
+    zinfo.compress_size = len(entry.data)
+    
+    # Mirrors ZipFile._open_to_write, but the header is final up front so no
+    # data descriptor or seek-back is needed, even on unseekable streams
+    with zipf._lock:
+        if zipf._writing:
+            raise ValueError("Can't write to ZIP archive while an open writing handle exists.")
+        if zipf._seekable:
+            zipf.fp.seek(zipf.start_dir)
+        zinfo.header_offset = zipf.fp.tell()
+        zipf._writecheck(zinfo)
+        zipf._didModify = True
+        zipf.fp.write(zinfo.FileHeader(False))
+        zipf.fp.write(entry.data)
+        zipf.start_dir = zipf.fp.tell()
+        zipf.filelist.append(zinfo)
+        zipf.NameToInfo[zinfo.filename] = zinfo
+
+def build_static_bundle(versions):
+    """Serialize and deflate the static files of every pack format"""
+    start = time.time()
+    packs = {}
+    for format_type, build_assets in [('datapack', datapack_assets),
+                                      ('behavior_pack', behavior_pack_assets),
+                                      ('complete_pack', complete_pack_assets)]:
+        packs[format_type] = tuple((arcname, compress_entry(content))
+                                   for arcname, content in build_assets())
+    logger.info(f"Static pack assets built in {time.time() - start:.3f}s")
+    return {
+        "versions": versions,
+        "packs": packs,
+        "table_recipe": compress_entry(TRANSFORMATION_TABLE_RECIPE)
+    }
+
+def get_static_bundle():
+    """Return the static asset bundle, rebuilding it if a source file changed"""
+    global static_bundle
+    versions = static_asset_versions()
+    bundle = static_bundle
+    if bundle is None or bundle["versions"] != versions:
+        with static_bundle_lock:
+            if static_bundle is None or static_bundle["versions"] != versions:
+                if static_bundle is not None:
+                    logger.info("Static pack assets changed on disk, rebuilding bundle")
+                static_bundle = build_static_bundle(versions)
+            bundle = static_bundle
+    return bundle
+
+def add_custom_metadata(zipf, items, date_time=None):
+    """Add README for custom structure"""
+    try:
+        readme_content = f"""# Custom Transformation Recipe Pack
+
+This pack contains {len(items)-1} transformation recipes organized by category.
+
+## Transformation Chain:
+"""
+        # Show the transformation chain
+        for i in range(len(items) - 1):
+            readme_content += f"{items[i]} → {items[i+1]}\n"
+        
+        # Folders come from the category rules the recipes were sorted with
+        classifier = get_category_classifier()
+        readme_content += "\n## Folder Structure:\n"
+        for name, keywords in classifier.folders:
+            readme_content += f"- {name}/ - Items whose names contain {', '.join(keywords)}\n"
+        readme_content += f"- {classifier.default}/ - Everything else\n"
+        
+        readme_content += f"""
+## Installation:
+Place the recipe files in your Minecraft data folder according to your needs.
+
+Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Total items in chain: {len(items)}
+"""
+        zip_write_raw(zipf, "README.md", compress_entry(readme_content), date_time)
+        logger.info("Added custom metadata README")
+    except Exception as e:
+        logger.error(f"Error adding custom metadata: {e}")